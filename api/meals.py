@@ -5,16 +5,17 @@ components. Meals are returned in `MealDetail` schema format.
 """
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session, load_only
 from typing import List
-import json
 from database.deps import get_db_read
 from core.logger import get_logger
 from database import models
 from schemas import MealDetail
 
 logger = get_logger("api.meals")
-router = APIRouter(prefix="/api", tags=["meals"])
+router = APIRouter(prefix="/api", tags=["meals"], default_response_class=ORJSONResponse)
 
 
 @router.get("/meals", response_model=List[MealDetail])
@@ -27,10 +28,21 @@ def list_meals(db: Session = Depends(get_db_read)):
     Returns:
         List of meal objects in `MealDetail` Pydantic format.
     """
-    meals = db.query(models.Meal).all()
-    out = []
-    for m in meals:
-        out.append(MealDetail(
+    # only load the columns MealDetail exposes; dietary_tags is never sent
+    stmt = select(models.Meal).options(load_only(
+        models.Meal.id,
+        models.Meal.name,
+        models.Meal.meal_type,
+        models.Meal.calories,
+        models.Meal.protein,
+        models.Meal.carbs,
+        models.Meal.fat,
+        models.Meal.ingredients,
+    ))
+    meals = db.execute(stmt).scalars().all()
+    # rows come straight from typed, non-null columns, so skip per-row validation
+    return [
+        MealDetail.model_construct(
             id=m.id,
             name=m.name,
             meal_type=m.meal_type,
@@ -38,6 +50,7 @@ def list_meals(db: Session = Depends(get_db_read)):
             protein=m.protein,
             carbs=m.carbs,
             fat=m.fat,
-            ingredients=json.loads(m.ingredients),
-        ))
-    return out
+            ingredients=m.ingredients,
+        )
+        for m in meals
+    ]
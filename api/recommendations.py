@@ -5,6 +5,7 @@ similarities for meals. Feedback is persisted for later training of CF models.
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from database.deps import get_db_write
 from database import models
@@ -17,10 +18,9 @@ from core.repository import save
 from core.exceptions import NotFoundError
 from datetime import datetime
 from typing import List
-import json
 
 logger = get_logger("api.recommendations")
-router = APIRouter(prefix="/api/recommendations", tags=["recommendations"])
+router = APIRouter(prefix="/api/recommendations", tags=["recommendations"], default_response_class=ORJSONResponse)
 
 
 @router.post("/{plan_id}/feedback", response_model=FeedbackResponse)
@@ -69,17 +69,15 @@ def get_similar_meals(meal_id: int, top_k: int = 5, db: Session = Depends(get_db
         raise NotFoundError("Meal", meal_id)
     
     ranked = content_recommender.recommend_similar(db, meal_id, top_k)
+    # fetch all ranked meals in one IN query instead of one SELECT per id
+    ids = [mid for mid, _ in ranked]
+    rows = db.query(models.Meal).filter(models.Meal.id.in_(ids)).all() if ids else []
+    by_id = {m.id: m for m in rows}
     results = []
-    for meal_id, score in ranked:
-        m = db.get(models.Meal, meal_id)
-        tags = []
-        try:
-            tags = json.loads(m.dietary_tags) if m.dietary_tags else []
-        except Exception:
-            try:
-                tags = eval(m.dietary_tags)
-            except Exception:
-                tags = []
+    for mid, score in ranked:
+        m = by_id.get(mid)
+        if m is None:
+            continue
         results.append(SimilarMeal(
             id=m.id,
             name=m.name,
@@ -88,8 +86,8 @@ def get_similar_meals(meal_id: int, top_k: int = 5, db: Session = Depends(get_db
             protein=m.protein,
             carbs=m.carbs,
             fat=m.fat,
-            dietary_tags=tags,
-            ingredients=json.loads(m.ingredients) if m.ingredients else [],
+            dietary_tags=m.dietary_tags,
+            ingredients=m.ingredients,
             score=score
         ))
     return results
@@ -1,20 +1,128 @@
 """Endpoints for training and predicting diet recommendations."""
 from fastapi import APIRouter, HTTPException, Body, Depends
+from fastapi.responses import ORJSONResponse
 from typing import Optional, Dict, Any, List
 from pydantic import BaseModel
-import json
+import logging
+from types import MappingProxyType, SimpleNamespace
+import numpy as np
 from services.diet_trainer import train_from_csv, predict_from_profile, load_model
 from services.recommendation_engine import recommendation_service
+from services.nutrition_calculator import nutrition_calculator
+from services.meal_source import get_meal_catalog, load_csv_catalog
 from database.deps import get_db_read
 from database import models
 from core.logger import get_logger
 from core.exceptions import NotFoundError, ModelNotTrainedError, ValidationError, InsufficientDataError
+from core.serialization import dumps
 
 logger = get_logger("api.train")
-router = APIRouter(prefix="/api/diet", tags=["diet"])
+router = APIRouter(prefix="/api/diet", tags=["diet"], default_response_class=ORJSONResponse)
 
 DEFAULT_CSV = "/home/deepak/Downloads/archive/diet_recommendations_dataset.csv"
 
+# stored user labels -> categories the diet model was trained on
+# (the training CSV spells them Male/Female and Sedentary/Moderate/Active)
+TRAINING_GENDER = MappingProxyType({'male': 'Male', 'female': 'Female'})
+TRAINING_ACTIVITY = MappingProxyType({
+    'sedentary': 'Sedentary',
+    'lightly_active': 'Moderate',
+    'moderately_active': 'Moderate',
+    'very_active': 'Active',
+    'extremely_active': 'Active',
+})
+
+# map common model labels to dietary tags used in meals
+LABEL_TO_TAG = MappingProxyType({
+    'balanced': 'is_healthy',
+    'low_carb': 'keto',
+    'low-carb': 'keto',
+    'low_sodium': 'low_sodium',
+    'low-sodium': 'low_sodium',
+    'high_protein': 'high-protein',
+    'gluten_free': 'gluten_free',
+    'vegetarian': 'vegetarian',
+    'vegan': 'vegan',
+    'paleo': 'paleo',
+    'mediterranean': 'mediterranean'
+})
+
+# normalize common shorthand preference values to dietary tags
+PREF_MAP = MappingProxyType({
+    'veg': 'vegetarian',
+    'vegetarian': 'vegetarian',
+    'vegan': 'vegan',
+    'keto': 'keto',
+    'low_carb': 'keto',
+    'low-carb': 'keto',
+    'gluten_free': 'gluten_free',
+    'gluten-free': 'gluten_free',
+    'paleo': 'paleo',
+    'mediterranean': 'mediterranean',
+    'balanced': 'is_healthy',
+})
+
+# accepted meal-tag spellings per canonical dietary tag; preferences outside
+# this table fall back to substring matching against meal tags
+TAG_ALIASES = MappingProxyType({
+    'vegetarian': frozenset({'vegetarian', 'veg'}),
+    'vegan': frozenset({'vegan'}),
+    'keto': frozenset({'keto', 'keto-friendly', 'low_carb', 'low-carb'}),
+    'gluten_free': frozenset({'gluten_free', 'gluten-free'}),
+    'paleo': frozenset({'paleo'}),
+    'mediterranean': frozenset({'mediterranean'}),
+    'is_healthy': frozenset({'is_healthy'}),
+    'high-protein': frozenset({'high-protein', 'high_protein'}),
+    'low_sodium': frozenset({'low_sodium', 'low-sodium'}),
+})
+
+
+def _compute_targets(profile: Dict[str, Any], diet_label: str) -> Dict[str, Any]:
+    """Derive body metrics and daily nutrition targets for an inline profile.
+
+    Missing profile fields fall back to the same defaults the endpoint has
+    always used (30 years, 170 cm, 70 kg, male, moderately active).
+    """
+    age = profile.get('Age', 30)
+    height = profile.get('Height_cm', 170)
+    weight = profile.get('Weight_kg', 70)
+    gender = profile.get('Gender', 'male')
+    activity = profile.get('Physical_Activity_Level', 'moderately_active')
+
+    targets = nutrition_calculator.compute_targets(age, height, weight, gender, activity, 'maintain', diet_label)
+    return {
+        'age': age,
+        'height': height,
+        'weight': weight,
+        'gender': gender,
+        'activity': activity,
+        'bmi': targets['bmi'],
+        'target_calories': targets['target_calories'],
+        'macros': targets['macros'],
+    }
+
+
+def _profile_from_user(user: models.User) -> Dict[str, Any]:
+    """Map a stored user to the model's profile keys and training categories.
+
+    Users store lowercase enum labels (``'male'``, ``'moderately_active'``);
+    the model only knows the training CSV's spelling, and its encoder
+    ignores unseen categories, so passing the labels through would silently
+    drop those features.
+    """
+    return {
+        "Age": user.age,
+        "Gender": TRAINING_GENDER.get(user.gender, user.gender),
+        "Weight_kg": user.weight,
+        "Height_cm": user.height,
+        "Physical_Activity_Level": TRAINING_ACTIVITY.get(user.activity_level, user.activity_level),
+        "Daily_Caloric_Intake": None,
+        "Dietary_Restrictions": None,
+        "Allergies": user.allergies,
+        "Preferred_Cuisine": None,
+        "Weekly_Exercise_Hours": None,
+    }
+
 
 class TrainRequest(BaseModel):
     """Request schema for training the diet model.
@@ -124,23 +232,11 @@ def predict(request: PredictRequest = Body(...), db=Depends(get_db_read)):
         raise ValidationError("Either user_id or profile must be provided")
 
     profile = None
+    user = db.get(models.User, request.user_id) if request.user_id is not None else None
     if request.user_id is not None:
-        user = db.get(models.User, request.user_id)
         if not user:
             raise NotFoundError("User", request.user_id)
-        # map user fields to expected profile keys
-        profile = {
-            "Age": user.age,
-            "Gender": user.gender,
-            "Weight_kg": user.weight,
-            "Height_cm": user.height,
-            "Physical_Activity_Level": user.activity_level,
-            "Daily_Caloric_Intake": None,
-            "Dietary_Restrictions": None,
-            "Allergies": user.allergies,
-            "Preferred_Cuisine": None,
-            "Weekly_Exercise_Hours": None,
-        }
+        profile = _profile_from_user(user)
     else:
         profile = request.profile
 
@@ -149,57 +245,79 @@ def predict(request: PredictRequest = Body(...), db=Depends(get_db_read)):
 
         # find meals that match predicted diet label using dietary_tags
         diet_label = out.get("diet_recommendation", "").lower()
+
+        # decide desired dietary preference from request.preference, profile, or predicted label
+        desired_pref = None
+        explicit_pref = False
+        try:
+            # top-level request preference overrides profile
+            if request.preference:
+                desired_pref = str(request.preference).strip().lower()
+                explicit_pref = True
+            elif profile and isinstance(profile, dict):
+                # accept multiple possible keys
+                pref = profile.get('Dietary_Preference') or profile.get('dietary_preference') or profile.get('Dietary_Restrictions')
+                if isinstance(pref, str):
+                    desired_pref = pref.strip().lower()
+                    explicit_pref = True
+            if desired_pref is None and diet_label:
+                desired_pref = diet_label
+
+            if desired_pref in PREF_MAP:
+                desired_tag = PREF_MAP[desired_pref]
+            else:
+                desired_tag = desired_pref
+        except Exception:
+            desired_pref = None
+            desired_tag = None
+
         meals = []
+        all_meals = []
+        # parsed (ingredients, preference hit) per meal, keyed by id(m) so ORM rows are left untouched
+        parsed = {}
+        matched_by_tag = []
+        catalog = None
         try:
             # If requested, use CSV fixtures as source of meals
+            # cached catalogs: numeric arrays for scoring, decoded tags/ingredients per meal
             if request.use_csv:
-                from data.ingest_meals import parse_meals_csv
-                from types import SimpleNamespace
-                csv_rows = parse_meals_csv("data/fixtures/healthy_meal_plans.csv")
-                all_meals = [SimpleNamespace(**{**r, "dietary_tags": r.get("dietary_tags", []), "ingredients": r.get("ingredients", [])}) for r in csv_rows]
+                catalog = load_csv_catalog()
             else:
-                all_meals = db.query(models.Meal).all()
-
-            # map common model labels to dietary tags used in meals
-            LABEL_TO_TAG = {
-                'balanced': 'is_healthy',
-                'low_carb': 'keto',
-                'low-carb': 'keto',
-                'low_sodium': 'low_sodium',
-                'low-sodium': 'low_sodium',
-                'high_protein': 'high-protein',
-                'gluten_free': 'gluten_free',
-                'vegetarian': 'vegetarian',
-                'vegan': 'vegan',
-                'paleo': 'paleo',
-                'mediterranean': 'mediterranean'
-            }
+                catalog = get_meal_catalog(db)
+            all_meals = catalog.meals
 
             target_tag = LABEL_TO_TAG.get(diet_label, diet_label)
 
-            # Find by tag
-            matched_by_tag = []
-            for m in all_meals:
-                tags = []
-                try:
-                    tags = json.loads(m.dietary_tags) if isinstance(m.dietary_tags, str) else (m.dietary_tags or [])
-                except Exception:
-                    try:
-                        tags = eval(m.dietary_tags)
-                    except Exception:
-                        tags = []
-                if any(target_tag == str(t).strip().lower() for t in tags):
+            # only an explicit preference that differs from the label tag can
+            # drop tag matches later; otherwise the first 10 matches are final
+            refilter = bool(explicit_pref and desired_tag and desired_tag != target_tag)
+
+            accepted = TAG_ALIASES.get(desired_tag) if desired_tag else None
+
+            # single pass: record both the diet-label tag match and the
+            # preference match used by the filters below
+            for m, tagset, ingredients in zip(all_meals, catalog.tagsets, catalog.ingredients):
+                if accepted is not None:
+                    pref_hit = not accepted.isdisjoint(tagset)
+                else:
+                    pref_hit = bool(desired_tag) and (desired_tag in tagset or any(desired_tag in t for t in tagset))
+                parsed[id(m)] = (ingredients, pref_hit)
+                if target_tag in tagset:
                     matched_by_tag.append(m)
+                    if not refilter and len(matched_by_tag) >= 10:
+                        break
+
             meals = matched_by_tag
             # debug info to help trace CSV matching in test environments
-            logger.debug("CSV debug: parsed_rows=%s, sample_tags=%s", len(all_meals), [ (getattr(m,'name',None), m.dietary_tags) for m in all_meals[:5] ])
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("CSV debug: parsed_rows=%s, sample_tags=%s", len(all_meals), [ (getattr(m,'name',None), m.dietary_tags) for m in all_meals[:5] ])
             logger.debug("CSV debug: matched_by_tag_count=%s target_tag=%s", len(matched_by_tag), target_tag)
             logger.debug("Matched by tag: %s", len(matched_by_tag))
 
             # fallback 1: use recommendation_service filter to find candidates using target_tag
             if not meals and target_tag:
-                meals = recommendation_service.filter_meals_by_preference(all_meals, target_tag)
-                logger.debug("After filter_meals_by_preference: %s", len(meals))
+                meals = [all_meals[i] for i in recommendation_service.filter_catalog_by_preference(catalog, target_tag)]
+                logger.debug("After filter_catalog_by_preference: %s", len(meals))
 
             # fallback 2: score all meals against a generic macro target derived from the diet label
             if not meals and diet_label:
@@ -208,10 +326,10 @@ def predict(request: PredictRequest = Body(...), db=Depends(get_db_read)):
                     default_cals = 2000
                     macros = recommendation_service.calculate_macros(default_cals, diet_label)
                     per_meal_cals = default_cals / 3
-                    # score_meal expects attributes on meal, adapt when rows are dict-like
-                    scored = [(recommendation_service.score_meal(m, per_meal_cals, macros), m) for m in all_meals]
-                    scored.sort(key=lambda x: x[0], reverse=True)
-                    meals = [m for _, m in scored[:10]]
+                    scores = recommendation_service.score_meals(catalog, per_meal_cals, macros)
+                    # top 10 by score; ties keep catalog order so results are deterministic
+                    top = np.lexsort((np.arange(len(scores)), -scores))[:10]
+                    meals = [all_meals[i] for i in top]
                     logger.debug("After scoring fallback: %s", len(meals))
                 except Exception:
                     meals = []
@@ -219,98 +337,20 @@ def predict(request: PredictRequest = Body(...), db=Depends(get_db_read)):
             logger.exception("Error while sourcing candidate meals: %s", exc)
             meals = []
 
-# decide desired dietary preference from request.preference, profile, or predicted label
-        desired_pref = None
-        explicit_pref = False
-        try:
-            # top-level request preference overrides profile
-            if request.preference:
-                desired_pref = str(request.preference).strip().lower()
-                explicit_pref = True
-            elif profile and isinstance(profile, dict):
-                # accept multiple possible keys
-                pref = profile.get('Dietary_Preference') or profile.get('dietary_preference') or profile.get('Dietary_Restrictions')
-                if isinstance(pref, str):
-                    desired_pref = pref.strip().lower()
-                    explicit_pref = True
-            if desired_pref is None and diet_label:
-                desired_pref = diet_label
-
-            # normalize common shorthand values
-            PREF_MAP = {
-                'veg': 'vegetarian',
-                'vegetarian': 'vegetarian',
-                'vegan': 'vegan',
-                'keto': 'keto',
-                'low_carb': 'keto',
-                'low-carb': 'keto',
-                'gluten_free': 'gluten_free',
-                'gluten-free': 'gluten_free',
-                'paleo': 'paleo',
-                'mediterranean': 'mediterranean',
-                'balanced': 'is_healthy',
-            }
-            if desired_pref in PREF_MAP:
-                desired_tag = PREF_MAP[desired_pref]
-            else:
-                desired_tag = desired_pref
-        except Exception:
-            desired_pref = None
-            desired_tag = None
-
         # If the request explicitly included a dietary preference, enforce verification by filtering
-        if explicit_pref and desired_tag:
-            pref_filtered = []
-            for m in meals:
-                try:
-                    tags = json.loads(m.dietary_tags) if m.dietary_tags else []
-                except Exception:
-                    try:
-                        tags = eval(m.dietary_tags)
-                    except Exception:
-                        tags = []
-                if any(str(t).strip().lower() == str(desired_tag).strip().lower() or str(desired_tag) in str(t).strip().lower() for t in tags):
-                    pref_filtered.append(m)
+        if explicit_pref and desired_tag and not (meals is matched_by_tag and desired_tag == target_tag):
+            pref_filtered = [m for m in meals if parsed[id(m)][1]]
             # If no matches in the current candidate set, try global filter across all meals
-            if not pref_filtered and desired_tag:
-                pref_filtered = recommendation_service.filter_meals_by_preference(all_meals, desired_tag)
+            if not pref_filtered and desired_tag and catalog is not None:
+                pref_filtered = [all_meals[i] for i in recommendation_service.filter_catalog_by_preference(catalog, desired_tag)]
             meals = pref_filtered
 
         # build meal details (limit top 10) and mark verification status
         recommended_meals = []
         for m in meals[:10]:
             try:
-                # robustly parse tags and ingredients whether data comes from DB or CSV rows
-                tags = []
-                if hasattr(m, 'dietary_tags'):
-                    if isinstance(m.dietary_tags, (list, tuple)):
-                        tags = [str(t).lower() for t in m.dietary_tags]
-                    else:
-                        try:
-                            tags = [str(t).lower() for t in json.loads(m.dietary_tags)]
-                        except Exception:
-                            try:
-                                tags = [str(t).lower() for t in eval(m.dietary_tags)]
-                            except Exception:
-                                tags = []
-
-                if hasattr(m, 'ingredients'):
-                    if isinstance(m.ingredients, (list, tuple)):
-                        ingredients = m.ingredients
-                    else:
-                        try:
-                            ingredients = json.loads(m.ingredients)
-                        except Exception:
-                            try:
-                                ingredients = eval(m.ingredients)
-                            except Exception:
-                                ingredients = []
-                else:
-                    ingredients = []
-
-                is_verified = False
-                if desired_tag:
-                    is_verified = any(desired_tag == t or desired_tag in t for t in tags)
+                # reuse the ingredients and preference match computed while sourcing candidates
+                ingredients, is_verified = parsed[id(m)]
 
                 recommended_meals.append({
                     "id": getattr(m, 'id', None),
@@ -327,47 +367,40 @@ def predict(request: PredictRequest = Body(...), db=Depends(get_db_read)):
                 # skip any problematic rows but continue
                 continue
 
+        # inline profiles: compute targets once for both the plan and the response
+        targets = _compute_targets(profile, diet_label) if user is None and profile else None
+
         # optionally generate a daily or weekly plan tailored to user/profile
         daily_plan = None
         weekly_plan = None
         try:
             # assemble a temporary profile with targets if possible
-            from types import SimpleNamespace
             user_obj = None
-            if request.user_id is not None:
-                user_obj = db.get(models.User, request.user_id)
+            if user is not None:
+                user_obj = user
             else:
                 # derive targets from inline profile
-                if profile:
-                    # compute TDEE/macros using nutrition calculator
-                    from services.nutrition_calculator import nutrition_calculator
-                    bmr = nutrition_calculator.calculate_bmr(profile.get('Age', 30), profile.get('Height_cm', 170), profile.get('Weight_kg', 70), profile.get('Gender', 'male'))
-                    tdee = nutrition_calculator.calculate_tdee(bmr, profile.get('Physical_Activity_Level', 'moderately_active'))
-                    target_cals = nutrition_calculator.calculate_target_calories(tdee, 'maintain')
-                    macros = nutrition_calculator.calculate_macros(target_cals, diet_label)
-                    user_obj = SimpleNamespace(target_calories=target_cals, target_protein=macros['protein'], target_carbs=macros['carbs'], target_fat=macros['fat'], dietary_preference=diet_label, allergies=json.dumps(profile.get('Allergies') or []))
+                if targets is not None:
+                    macros = targets['macros']
+                    user_obj = SimpleNamespace(target_calories=targets['target_calories'], target_protein=macros['protein'], target_carbs=macros['carbs'], target_fat=macros['fat'], dietary_preference=diet_label, allergies=dumps(profile.get('Allergies') or []))
             if user_obj is not None:
                 # Use same meal source (CSV or DB) as recommended_meals
                 is_weekly = getattr(request, 'weekly', False)
                 if is_weekly:
                     # Generate weekly plan
-                    weekly_plan = recommendation_service.generate_weekly_meal_plan(user_obj, all_meals)
+                    weekly_plan = recommendation_service.generate_weekly_meal_plan(user_obj, all_meals, catalog=catalog)
                 else:
                     # Generate daily plan
-                    plan = recommendation_service.generate_daily_meal_plan(user_obj, all_meals)
+                    plan = recommendation_service.generate_daily_meal_plan(user_obj, all_meals, catalog=catalog)
                     daily_plan = plan
         except Exception as exc:
             logger.exception("Failed to generate meal plan: %s", exc)
             daily_plan = None
             weekly_plan = None
 
-        # Build comprehensive response with user profile info
-        from services.nutrition_calculator import nutrition_calculator
-        
         # Calculate user profile details
         user_data = {}
-        if request.user_id is not None:
-            user = db.get(models.User, request.user_id)
+        if user is not None:
             user_data = {
                 'user_id': user.id,
                 'name': user.name,
@@ -387,31 +420,22 @@ def predict(request: PredictRequest = Body(...), db=Depends(get_db_read)):
                 }
             }
         else:
-            # For inline profiles, calculate targets
-            age = profile.get('Age', 30)
-            height = profile.get('Height_cm', 170)
-            weight = profile.get('Weight_kg', 70)
-            gender = profile.get('Gender', 'male')
-            activity = profile.get('Physical_Activity_Level', 'moderately_active')
-            
-            bmi = nutrition_calculator.calculate_bmi(height, weight)
-            bmr = nutrition_calculator.calculate_bmr(age, height, weight, gender)
-            tdee = nutrition_calculator.calculate_tdee(bmr, activity)
-            target_cals = nutrition_calculator.calculate_target_calories(tdee, 'maintain')
-            macros = nutrition_calculator.calculate_macros(target_cals, diet_label)
-            
+            # For inline profiles, report the targets computed above
+            if targets is None:
+                targets = _compute_targets(profile, diet_label)
+            macros = targets['macros']
             user_data = {
                 'user_id': None,
                 'name': profile.get('name', 'Guest User'),
-                'age': age,
-                'height': height,
-                'weight': weight,
-                'bmi': round(bmi, 1),
-                'gender': gender,
-                'activity_level': activity,
+                'age': targets['age'],
+                'height': targets['height'],
+                'weight': targets['weight'],
+                'bmi': round(targets['bmi'], 1),
+                'gender': targets['gender'],
+                'activity_level': targets['activity'],
                 'health_goal': profile.get('health_goal', 'maintain'),
                 'dietary_preference': diet_label,
-                'target_calories': round(target_cals),
+                'target_calories': round(targets['target_calories']),
                 'target_macros': {
                     'protein': round(macros['protein']),
                     'carbs': round(macros['carbs']),
@@ -5,22 +5,46 @@ users with their latest meal plans. Endpoints use dependency-injected DB
 sessions and the recommendation service to assemble results.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, load_only
 from typing import List
-import json
+import numpy as np
+from datetime import date
 from database.deps import get_db_read, get_db_write
 from core.logger import get_logger
-from core.repository import save
+from core.serialization import dumps
+from core.repository import save_rows
 from core.exceptions import NotFoundError, DatabaseError, InsufficientDataError
 from services.recommendation_engine import recommendation_service
 from services.nutrition_calculator import nutrition_calculator
+from services.meal_source import get_meal_catalog, load_csv_catalog
 from database import models
-from schemas import UserCreateRequest, UserWithMealPlanResponse, AllUsersResponse, MealDetail
+from schemas import UserCreateRequest, UserWithMealPlanResponse, AllUsersResponse
 from schemas.user_schema import WeeklyMealPlanResponse
 
 logger = get_logger("api.users")
-router = APIRouter(prefix="/api", tags=["users"])
+router = APIRouter(prefix="/api", tags=["users"], default_response_class=ORJSONResponse)
+
+# largest page /users-with-plans serves; bounds the rows built per request
+USERS_PAGE_MAX = 500
+
+
+def _plan_row(user_id: int, plan_date, plan: dict) -> dict:
+    """Map a generated day plan to `MealPlan` column values."""
+    return {
+        "user_id": user_id,
+        "plan_date": plan_date,
+        "breakfast_id": plan['breakfast']['id'],
+        "lunch_id": plan['lunch']['id'],
+        "dinner_id": plan['dinner']['id'],
+        "snack_id": plan['snack']['id'] if plan.get('snack') else None,
+        "total_calories": plan['daily_totals']['calories'],
+        "total_protein": plan['daily_totals']['protein'],
+        "total_carbs": plan['daily_totals']['carbs'],
+        "total_fat": plan['daily_totals']['fat'],
+    }
 
 
 @router.post("/create-user-with-plan", response_model=UserWithMealPlanResponse, status_code=201)
@@ -43,11 +67,13 @@ def create_user_with_plan(payload: UserCreateRequest, db: Session = Depends(get_
         DatabaseError: If database operation fails.
     """
     logger.info("Creating user: %s (use_csv=%s)", payload.name, payload.use_csv)
-    bmi = nutrition_calculator.calculate_bmi(payload.height, payload.weight)
-    bmr = nutrition_calculator.calculate_bmr(payload.age, payload.height, payload.weight, payload.gender)
-    tdee = nutrition_calculator.calculate_tdee(bmr, payload.activity_level)
-    target_calories = nutrition_calculator.calculate_target_calories(tdee, payload.health_goal)
-    target_macros = nutrition_calculator.calculate_macros(target_calories, payload.dietary_preference)
+    targets = nutrition_calculator.compute_targets(
+        payload.age, payload.height, payload.weight, payload.gender,
+        payload.activity_level, payload.health_goal, payload.dietary_preference,
+    )
+    bmi = targets['bmi']
+    target_calories = targets['target_calories']
+    target_macros = targets['macros']
 
     user = models.User(
         name=payload.name,
@@ -58,63 +84,41 @@ def create_user_with_plan(payload: UserCreateRequest, db: Session = Depends(get_
         activity_level=payload.activity_level,
         dietary_preference=payload.dietary_preference,
         health_goal=payload.health_goal,
-        allergies=json.dumps(payload.allergies or []),
+        allergies=dumps(payload.allergies or []),
         target_calories=target_calories,
         target_protein=target_macros['protein'],
         target_carbs=target_macros['carbs'],
         target_fat=target_macros['fat'],
     )
-    user = save(db, user)
+    # flush assigns user.id; user and plans are committed together below
+    db.add(user)
+    db.flush()
 
     # Source meals from CSV or database based on use_csv flag
     if payload.use_csv:
-        from data.ingest_meals import parse_meals_csv
-        from types import SimpleNamespace
-        csv_rows = parse_meals_csv("data/fixtures/healthy_meal_plans.csv")
-        all_meals = [SimpleNamespace(**{**r, "dietary_tags": r.get("dietary_tags", []), "ingredients": r.get("ingredients", [])}) for r in csv_rows]
-        logger.info("Loaded %s meals from CSV", len(all_meals))
+        catalog = load_csv_catalog()
+        logger.info("Loaded %s meals from CSV", len(catalog))
     else:
-        all_meals = db.query(models.Meal).all()
-        logger.info("Loaded %s meals from database", len(all_meals))
+        catalog = get_meal_catalog(db)
+        logger.info("Loaded %s meals from database", len(catalog))
+    all_meals = catalog.meals
     
     if not all_meals:
         raise InsufficientDataError("No meals available. Please load meal data first.")
     
     # Generate both daily and weekly plans
-    daily_plan = recommendation_service.generate_daily_meal_plan(user, all_meals)
-    weekly_plan = recommendation_service.generate_weekly_meal_plan(user, all_meals)
-
-    # Save daily plan to database
-    meal_plan = models.MealPlan(
-        user_id=user.id,
-        plan_date=__import__('datetime').date.today(),
-        breakfast_id=daily_plan['breakfast']['id'],
-        lunch_id=daily_plan['lunch']['id'],
-        dinner_id=daily_plan['dinner']['id'],
-        snack_id=daily_plan['snack']['id'] if daily_plan.get('snack') else None,
-        total_calories=daily_plan['daily_totals']['calories'],
-        total_protein=daily_plan['daily_totals']['protein'],
-        total_carbs=daily_plan['daily_totals']['carbs'],
-        total_fat=daily_plan['daily_totals']['fat'],
-    )
-    save(db, meal_plan)
-
-    # Save weekly plans to database
-    from datetime import datetime
-    for day_plan in weekly_plan:
-        weekly_meal_plan = models.MealPlan(
-            user_id=user.id,
-            plan_date=datetime.fromisoformat(day_plan['date']),
-            breakfast_id=day_plan['breakfast']['id'],
-            lunch_id=day_plan['lunch']['id'],
-            dinner_id=day_plan['dinner']['id'],
-            snack_id=day_plan.get('snack', {}).get('id') if day_plan.get('snack') else None,
-            total_calories=day_plan['daily_totals']['calories'],
-            total_protein=day_plan['daily_totals']['protein'],
-            total_carbs=day_plan['daily_totals']['carbs'],
-            total_fat=day_plan['daily_totals']['fat'],
-        )
-        save(db, weekly_meal_plan)
+    # filter once; both planners draw from the same per-meal-type pools
+    pools = recommendation_service.build_candidate_pools(user, catalog)
+    daily_plan = recommendation_service.generate_daily_meal_plan(user, all_meals, catalog=catalog, pools=pools)
+    weekly_plan = recommendation_service.generate_weekly_meal_plan(user, all_meals, catalog=catalog, pools=pools)
+
+    # Daily plan plus the 7 weekly plans as plain rows for one multi-row INSERT
+    rows = [_plan_row(user.id, date.today(), daily_plan)]
+    rows.extend(_plan_row(user.id, date.fromisoformat(d['date']), d) for d in weekly_plan)
+
+    # Single commit for the user and all plan rows
+    save_rows(db, models.MealPlan, rows)
+    db.refresh(user)
 
     logger.info("User %s created with id=%s (daily + weekly plans)", user.name, user.id)
 
@@ -161,11 +165,13 @@ def create_user_with_weekly_plan(payload: UserCreateRequest, db: Session = Depen
         DatabaseError: If database operation fails.
     """
     logger.info("Creating user with weekly plan: %s", payload.name)
-    bmi = nutrition_calculator.calculate_bmi(payload.height, payload.weight)
-    bmr = nutrition_calculator.calculate_bmr(payload.age, payload.height, payload.weight, payload.gender)
-    tdee = nutrition_calculator.calculate_tdee(bmr, payload.activity_level)
-    target_calories = nutrition_calculator.calculate_target_calories(tdee, payload.health_goal)
-    target_macros = nutrition_calculator.calculate_macros(target_calories, payload.dietary_preference)
+    targets = nutrition_calculator.compute_targets(
+        payload.age, payload.height, payload.weight, payload.gender,
+        payload.activity_level, payload.health_goal, payload.dietary_preference,
+    )
+    bmi = targets['bmi']
+    target_calories = targets['target_calories']
+    target_macros = targets['macros']
 
     user = models.User(
         name=payload.name,
@@ -176,36 +182,27 @@ def create_user_with_weekly_plan(payload: UserCreateRequest, db: Session = Depen
         activity_level=payload.activity_level,
         dietary_preference=payload.dietary_preference,
         health_goal=payload.health_goal,
-        allergies=json.dumps(payload.allergies or []),
+        allergies=dumps(payload.allergies or []),
         target_calories=target_calories,
         target_protein=target_macros['protein'],
         target_carbs=target_macros['carbs'],
         target_fat=target_macros['fat'],
     )
-    user = save(db, user)
+    # flush assigns user.id; user and plans are committed together below
+    db.add(user)
+    db.flush()
 
-    all_meals = db.query(models.Meal).all()
+    catalog = get_meal_catalog(db)
+    all_meals = catalog.meals
     if not all_meals:
         raise InsufficientDataError("No meals available in database. Please load meal data first.")
     
-    weekly_plan = recommendation_service.generate_weekly_meal_plan(user, all_meals)
-
-    # Save all 7 daily plans to database
-    from datetime import datetime
-    for day_plan in weekly_plan:
-        meal_plan = models.MealPlan(
-            user_id=user.id,
-            plan_date=datetime.fromisoformat(day_plan['date']),
-            breakfast_id=day_plan['breakfast']['id'],
-            lunch_id=day_plan['lunch']['id'],
-            dinner_id=day_plan['dinner']['id'],
-            snack_id=day_plan.get('snack', {}).get('id') if day_plan.get('snack') else None,
-            total_calories=day_plan['daily_totals']['calories'],
-            total_protein=day_plan['daily_totals']['protein'],
-            total_carbs=day_plan['daily_totals']['carbs'],
-            total_fat=day_plan['daily_totals']['fat'],
-        )
-        save(db, meal_plan)
+    weekly_plan = recommendation_service.generate_weekly_meal_plan(user, all_meals, catalog=catalog)
+
+    # Save all 7 daily plans with one multi-row INSERT and a single commit
+    rows = [_plan_row(user.id, date.fromisoformat(d['date']), d) for d in weekly_plan]
+    save_rows(db, models.MealPlan, rows)
+    db.refresh(user)
 
     logger.info("User %s created with weekly plan (id=%s)", user.name, user.id)
 
@@ -231,52 +228,92 @@ def create_user_with_weekly_plan(payload: UserCreateRequest, db: Session = Depen
     return response
 
 
-@router.get("/users-with-plans", response_model=AllUsersResponse)
-def get_users_with_plans(limit: int = 50, skip: int = 0, db: Session = Depends(get_db_read)):
-    """Return a paginated list of users together with their latest meal plan.
-
-    Args:
-        limit (int): Maximum number of users to return.
-        skip (int): Number of users to skip (pagination).
-        db: Read-only SQLAlchemy session injected by dependency.
+def _users_with_plans_rows(db: Session, offset: int, limit: int) -> List[dict]:
+    """Build the response rows for one page slice of users.
 
-    Returns:
-        `AllUsersResponse` containing total_users and list of user objects.
+    Runs three queries: the users, the latest plan per user (ranked with
+    `row_number()`), and every meal those plans reference.
     """
-    users = db.query(models.User).offset(skip).limit(limit).all()
+    # only the columns the response uses (skips gender, activity, allergies)
+    users = (
+        db.query(models.User)
+        .options(load_only(
+            models.User.id, models.User.name, models.User.age, models.User.height,
+            models.User.weight, models.User.health_goal, models.User.dietary_preference,
+            models.User.target_calories, models.User.target_protein,
+            models.User.target_carbs, models.User.target_fat, models.User.created_at,
+        ))
+        .order_by(models.User.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+    # latest plan per user in one query: rank each user's plans newest-first
+    latest_by_user = {}
+    user_ids = [u.id for u in users]
+    if user_ids:
+        ranked = (
+            select(
+                models.MealPlan.id,
+                func.row_number().over(
+                    partition_by=models.MealPlan.user_id,
+                    order_by=(models.MealPlan.plan_date.desc(), models.MealPlan.id),
+                ).label("rn"),
+            )
+            .where(models.MealPlan.user_id.in_(user_ids))
+            .subquery()
+        )
+        stmt = select(models.MealPlan).join(ranked, models.MealPlan.id == ranked.c.id).where(ranked.c.rn == 1)
+        latest_by_user = {p.user_id: p for p in db.execute(stmt).scalars()}
+
+    # every meal referenced by those plans in one IN query, decoded once
+    meal_ids = {
+        mid
+        for p in latest_by_user.values()
+        for mid in (p.breakfast_id, p.lunch_id, p.dinner_id, p.snack_id)
+        if mid is not None
+    }
+    meals_by_id = {}
+    if meal_ids:
+        meal_rows = (
+            db.query(models.Meal)
+            .options(load_only(
+                models.Meal.id, models.Meal.name, models.Meal.meal_type, models.Meal.calories,
+                models.Meal.protein, models.Meal.carbs, models.Meal.fat, models.Meal.ingredients,
+            ))
+            .filter(models.Meal.id.in_(meal_ids))
+        )
+        # plain dicts in `MealDetail` field order; rows are encoded directly
+        for m in meal_rows:
+            meals_by_id[m.id] = {
+                "id": m.id,
+                "name": m.name,
+                "meal_type": m.meal_type,
+                "calories": m.calories,
+                "protein": m.protein,
+                "carbs": m.carbs,
+                "fat": m.fat,
+                "ingredients": m.ingredients,
+            }
+
+    # BMI for the whole batch in one vectorized pass (same formula as
+    # `calculate_bmi`, including 0.0 for non-positive heights)
+    heights_m = np.fromiter((u.height for u in users), dtype=np.float64, count=len(users)) / 100.0
+    weights = np.fromiter((u.weight for u in users), dtype=np.float64, count=len(users))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bmis = np.where(heights_m > 0, weights / (heights_m * heights_m), 0.0)
+
     result = []
-    for u in users:
-        latest_plan = db.query(models.MealPlan).filter(models.MealPlan.user_id == u.id).order_by(models.MealPlan.plan_date.desc()).first()
+    for u, bmi in zip(users, bmis.tolist()):
+        latest_plan = latest_by_user.get(u.id)
         if latest_plan:
-            def meal_to_detail(meal_id):
-                """Convert a meal ID to MealDetail schema object.
-                
-                Args:
-                    meal_id: Database ID of the meal.
-                    
-                Returns:
-                    MealDetail object or None if meal not found.
-                """
-                m = db.query(models.Meal).get(meal_id)
-                if not m:
-                    return None
-                return MealDetail(
-                    id=m.id,
-                    name=m.name,
-                    meal_type=m.meal_type,
-                    calories=m.calories,
-                    protein=m.protein,
-                    carbs=m.carbs,
-                    fat=m.fat,
-                    ingredients=json.loads(m.ingredients),
-                )
-
             plan_obj = {
                 "date": latest_plan.plan_date.isoformat(),
-                "breakfast": meal_to_detail(latest_plan.breakfast_id),
-                "lunch": meal_to_detail(latest_plan.lunch_id),
-                "dinner": meal_to_detail(latest_plan.dinner_id),
-                "snack": meal_to_detail(latest_plan.snack_id) if latest_plan.snack_id else None,
+                "breakfast": meals_by_id.get(latest_plan.breakfast_id),
+                "lunch": meals_by_id.get(latest_plan.lunch_id),
+                "dinner": meals_by_id.get(latest_plan.dinner_id),
+                "snack": meals_by_id.get(latest_plan.snack_id) if latest_plan.snack_id else None,
                 "daily_totals": {
                     "calories": latest_plan.total_calories,
                     "protein": latest_plan.total_protein,
@@ -292,7 +329,7 @@ def get_users_with_plans(limit: int = 50, skip: int = 0, db: Session = Depends(g
             "age": u.age,
             "height": u.height,
             "weight": u.weight,
-            "bmi": round(nutrition_calculator.calculate_bmi(u.height, u.weight),1),
+            "bmi": round(bmi, 1),
             "health_goal": u.health_goal,
             "dietary_preference": u.dietary_preference,
             "target_calories": round(u.target_calories),
@@ -300,5 +337,24 @@ def get_users_with_plans(limit: int = 50, skip: int = 0, db: Session = Depends(g
             "meal_plan": plan_obj,
             "created_at": u.created_at.isoformat(),
         })
+    return result
 
+
+@router.get("/users-with-plans", response_model=AllUsersResponse)
+def get_users_with_plans(
+    limit: int = Query(50, ge=1, le=USERS_PAGE_MAX),
+    skip: int = Query(0, ge=0),
+    db: Session = Depends(get_db_read),
+):
+    """Return a paginated list of users together with their latest meal plan.
+
+    Args:
+        limit (int): Maximum number of users to return (1 to `USERS_PAGE_MAX`).
+        skip (int): Number of users to skip (pagination).
+        db: Read-only SQLAlchemy session injected by dependency.
+
+    Returns:
+        `AllUsersResponse` containing total_users and list of user objects.
+    """
+    result = _users_with_plans_rows(db, skip, limit)
     return AllUsersResponse(total_users=len(result), users=result)
@@ -5,13 +5,12 @@ across all API endpoints.
 """
 
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 from core.exceptions import AppException
 from core.logger import get_logger
 from typing import Union
-import traceback
 
 logger = get_logger("core.error_handlers")
 
@@ -21,7 +20,7 @@ def create_error_response(
     status_code: int = 500,
     details: dict = None,
     request_id: str = None
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Create a standardized error response.
     
     Args:
@@ -31,28 +30,21 @@ def create_error_response(
         request_id: Optional request ID for tracking.
         
     Returns:
-        JSONResponse with error details.
+        ORJSONResponse with error details.
     """
-    error_body = {
-        "error": {
-            "message": message,
-            "status_code": status_code,
-        }
-    }
-    
+    error = {"message": message, "status_code": status_code}
     if details:
-        error_body["error"]["details"] = details
-    
+        error["details"] = details
     if request_id:
-        error_body["error"]["request_id"] = request_id
+        error["request_id"] = request_id
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status_code,
-        content=error_body
+        content={"error": error}
     )
 
 
-async def app_exception_handler(request: Request, exc: AppException) -> JSONResponse:
+async def app_exception_handler(request: Request, exc: AppException) -> ORJSONResponse:
     """Handle custom application exceptions.
     
     Args:
@@ -60,7 +52,7 @@ async def app_exception_handler(request: Request, exc: AppException) -> JSONResp
         exc: Application exception instance.
         
     Returns:
-        JSONResponse with error details.
+        ORJSONResponse with error details.
     """
     logger.warning(
         "Application error: %s [%s %s]",
@@ -79,7 +71,7 @@ async def app_exception_handler(request: Request, exc: AppException) -> JSONResp
 async def validation_exception_handler(
     request: Request,
     exc: RequestValidationError
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Handle Pydantic validation errors.
     
     Args:
@@ -87,16 +79,16 @@ async def validation_exception_handler(
         exc: Pydantic validation error.
         
     Returns:
-        JSONResponse with validation error details.
+        ORJSONResponse with validation error details.
     """
-    errors = []
-    for error in exc.errors():
-        field = ".".join(str(loc) for loc in error["loc"])
-        errors.append({
-            "field": field,
+    errors = [
+        {
+            "field": ".".join(str(loc) for loc in error["loc"]),
             "message": error["msg"],
             "type": error["type"]
-        })
+        }
+        for error in exc.errors()
+    ]
     
     logger.warning(
         "Validation error on %s %s: %s",
@@ -115,7 +107,7 @@ async def validation_exception_handler(
 async def sqlalchemy_exception_handler(
     request: Request,
     exc: SQLAlchemyError
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Handle SQLAlchemy database errors.
     
     Args:
@@ -123,7 +115,7 @@ async def sqlalchemy_exception_handler(
         exc: SQLAlchemy error.
         
     Returns:
-        JSONResponse with database error details.
+        ORJSONResponse with database error details.
     """
     logger.error(
         "Database error on %s %s: %s",
@@ -144,7 +136,7 @@ async def sqlalchemy_exception_handler(
 async def generic_exception_handler(
     request: Request,
     exc: Exception
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Handle all unhandled exceptions.
     
     Args:
@@ -152,7 +144,7 @@ async def generic_exception_handler(
         exc: Unhandled exception.
         
     Returns:
-        JSONResponse with generic error message.
+        ORJSONResponse with generic error message.
     """
     logger.error(
         "Unhandled exception on %s %s: %s",
@@ -162,9 +154,6 @@ async def generic_exception_handler(
         exc_info=True
     )
     
-    # Log full traceback for debugging
-    logger.error("Traceback: %s", traceback.format_exc())
-    
     # Return generic error to client
     return create_error_response(
         message="An internal server error occurred",
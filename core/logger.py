@@ -1,12 +1,16 @@
 """Logging helpers for the application.
 
 Provides a convenience `get_logger` factory that configures a stream and
-rotating file handler for consistent logging across modules.
+rotating file handler for consistent logging across modules. Loggers only
+enqueue records; a background `QueueListener` thread does the console and
+file writes, so logging never blocks a request on disk I/O.
 """
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 LOG_DIR = os.path.join(os.path.dirname(__file__), "..", "logs")
 if not os.path.exists(LOG_DIR):
@@ -22,9 +26,15 @@ _stream_handler.setFormatter(_formatter)
 _file_handler = RotatingFileHandler(LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=3)
 _file_handler.setFormatter(_formatter)
 
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_queue_handler = QueueHandler(_log_queue)
+_listener = QueueListener(_log_queue, _stream_handler, _file_handler, respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
+
 
 def get_logger(name: str = __name__, level: int = logging.INFO) -> logging.Logger:
-    """Return a configured logger with stream and rotating file handlers.
+    """Return a configured logger that writes via the shared log queue.
 
     Ensures a consistent logging setup across the application and avoids
     adding duplicate handlers when called multiple times.
@@ -32,6 +42,5 @@ def get_logger(name: str = __name__, level: int = logging.INFO) -> logging.Logge
     logger = logging.getLogger(name)
     if not logger.handlers:
         logger.setLevel(level)
-        logger.addHandler(_stream_handler)
-        logger.addHandler(_file_handler)
+        logger.addHandler(_queue_handler)
     return logger
@@ -4,6 +4,7 @@ Provides common CRUD operations and transaction management utilities
 to reduce boilerplate in API endpoints and service layers.
 """
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from typing import TypeVar, Generic, Type, Optional, List, Any
 from database.models import Base
@@ -44,18 +45,19 @@ class BaseRepository(Generic[T]):
         return obj
 
     def create_many(self, objects: List[T]) -> List[T]:
-        """Add multiple objects, commit and refresh all.
+        """Add multiple objects and commit them in one transaction.
+
+        Objects are not refreshed one by one; they are expired by the commit
+        and reload lazily if an attribute is read afterwards.
         
         Args:
             objects: List of model instances to persist.
             
         Returns:
-            List of persisted objects with refreshed attributes.
+            List of persisted objects.
         """
         self.session.add_all(objects)
         self.session.commit()
-        for obj in objects:
-            self.session.refresh(obj)
         return objects
 
     def get_by_id(self, id: Any) -> Optional[T]:
@@ -144,17 +146,42 @@ def save(session: Session, obj: Base) -> Base:
 
 
 def save_all(session: Session, objects: List[Base]) -> List[Base]:
-    """Convenience function to add multiple objects, commit and refresh.
+    """Convenience function to add multiple objects and commit once.
+
+    Objects are not refreshed one by one; they are expired by the commit
+    and reload lazily if an attribute is read afterwards.
     
     Args:
         session: Database session.
         objects: List of model instances to persist.
         
     Returns:
-        List of persisted objects with refreshed attributes.
+        List of persisted objects.
     """
     session.add_all(objects)
     session.commit()
-    for obj in objects:
-        session.refresh(obj)
     return objects
+
+
+def save_rows(session: Session, model: Type[T], rows: List[dict], commit: bool = True) -> int:
+    """Bulk-insert plain row dicts with one executemany.
+
+    Skips ORM object construction and unit-of-work bookkeeping entirely;
+    column defaults declared on the model still apply.
+
+    Args:
+        session: Database session.
+        model: SQLAlchemy model class to insert into.
+        rows: Column-name to value mappings, one per row.
+        commit: Commit after the insert; pass False to batch several
+            inserts into the caller's transaction.
+
+    Returns:
+        Number of rows inserted.
+    """
+    if not rows:
+        return 0
+    session.execute(insert(model), rows)
+    if commit:
+        session.commit()
+    return len(rows)
@@ -0,0 +1,46 @@
+"""JSON serialization helpers.
+
+Thin wrappers around `orjson`, a C implementation that parses JSON several
+times faster than the stdlib `json` module. Meal tags and ingredients are
+stored as JSON-encoded text, so these helpers sit on the hot path of every
+endpoint that lists or ranks meals.
+"""
+
+from typing import Any
+import ast
+import orjson
+
+loads = orjson.loads
+
+
+def dumps(value: Any) -> str:
+    """Encode a value as compact JSON text (``str``, ready for a Text column)."""
+    return orjson.dumps(value).decode()
+
+
+def parse_list(value: Any) -> list:
+    """Decode a tags/ingredients field into a Python list.
+
+    Accepts lists and tuples as-is, JSON text, and Python list literals
+    (``"['vegan', 'keto']"``) written by older seeding code. Literals are
+    decoded with ``ast.literal_eval`` so stored data is never executed.
+
+    Args:
+        value: List, tuple, JSON/literal text or None.
+
+    Returns:
+        Decoded list, or ``[]`` if the value is empty, malformed or does
+        not decode to a list.
+    """
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    try:
+        parsed = loads(value)
+    except Exception:
+        try:
+            parsed = ast.literal_eval(value)
+        except Exception:
+            return []
+    return list(parsed) if isinstance(parsed, (list, tuple)) else []
@@ -2,6 +2,7 @@
 
 This module provides:
 - parse_meals_csv(csv_path): returns a list of normalized meal dicts
+- iter_parse_meals_csv(csv_path, chunksize): yields those dicts in chunks
 - seed_meals_from_csv(csv_path, session): idempotently seeds the meals table
 
 The CSV expected columns include at least `meal_name` and numeric nutrition columns
@@ -12,16 +13,40 @@ issues in the provided fixtures.
 """
 from __future__ import annotations
 
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional
+import hashlib
 import logging
+import numpy as np
 import pandas as pd
 import math
+import os
+import re
+import tempfile
+
+from sqlalchemy import select
 
 from database.database import WriteSessionLocal
 from database import models
+from core.repository import save_rows
+from core.serialization import dumps, loads
 
 logger = logging.getLogger("data.ingest_meals")
 
+# Bump when the parsed output changes so stale sidecar caches are ignored
+PARSE_CACHE_VERSION = 1
+PARSE_CACHE_SUFFIX = ".parsed.json"
+# Directory parsed-CSV caches are kept in; an empty value disables them
+PARSE_CACHE_DIR = os.getenv(
+    "MEAL_PARSE_CACHE_DIR",
+    os.path.join(os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "dietitian"),
+)
+
+# names per IN (...) lookup, well under SQLite's bound-parameter limit
+NAME_LOOKUP_CHUNK = 500
+
+# CSV rows parsed (and seeded) per batch
+CSV_CHUNK_SIZE = 50_000
+
 KNOWN_TAGS = {
     "vegan",
     "vegetarian",
@@ -32,6 +57,25 @@ KNOWN_TAGS = {
     "is_healthy",
 }
 
+# Declared dtypes for the well-formed case: numeric nutrition and 0/1 tag
+# columns parse straight to float64 without per-column type inference.
+# Columns missing from a file are ignored.
+CSV_DTYPES = {col: "float64" for col in ("calories", "protein", "carbs", "fat", *sorted(KNOWN_TAGS))}
+
+
+NUTRITION_RANGES = {
+    'calories': (50, 800),    # kcal per meal
+    'protein': (0, 60),       # grams
+    'carbs': (0, 100),        # grams
+    'fat': (0, 40)            # grams
+}
+
+# Column order of the nutrition matrix built by `_nutrition_matrix`, with
+# each nutrient's range as aligned vectors so denormalization broadcasts
+NUTRIENTS = ('calories', 'protein', 'carbs', 'fat')
+_NUTRIENT_MIN = np.array([NUTRITION_RANGES[n][0] for n in NUTRIENTS], dtype=np.float64)
+_NUTRIENT_MAX = np.array([NUTRITION_RANGES[n][1] for n in NUTRIENTS], dtype=np.float64)
+
 
 def denormalize_nutrition(normalized_value: float, nutrient_type: str) -> float:
     """Convert normalized 0-1 values to real nutritional units.
@@ -43,15 +87,7 @@ def denormalize_nutrition(normalized_value: float, nutrient_type: str) -> float:
     Returns:
         Real-world value in appropriate units (kcal or grams).
     """
-    # Define realistic ranges for each nutrient per meal
-    ranges = {
-        'calories': (50, 800),    # kcal per meal
-        'protein': (0, 60),       # grams
-        'carbs': (0, 100),        # grams
-        'fat': (0, 40)            # grams
-    }
-    
-    min_val, max_val = ranges.get(nutrient_type, (0, 100))
+    min_val, max_val = NUTRITION_RANGES.get(nutrient_type, (0, 100))
     # Check if value appears to be already denormalized (> 1.5)
     if normalized_value > 1.5:
         return normalized_value
@@ -59,6 +95,19 @@ def denormalize_nutrition(normalized_value: float, nutrient_type: str) -> float:
     return min_val + (normalized_value * (max_val - min_val))
 
 
+# Keyword groups checked in priority order; each group is a single
+# compiled alternation instead of one substring test per keyword.
+MEAL_TYPE_PATTERNS = [
+    (re.compile("|".join(keywords)), meal_type)
+    for keywords, meal_type in (
+        (("pancake", "omelette", "oatmeal", "yogurt", "breakfast"), "breakfast"),
+        (("salad", "sandwich", "wrap", "bowl", "tofu", "quinoa"), "lunch"),
+        (("stew", "curry", "steak", "salmon", "dinner", "pizza", "pasta"), "dinner"),
+        (("snack", "chips", "nuts", "hummus", "edamame", "fruit"), "snack"),
+    )
+]
+
+
 def infer_meal_type(name: str) -> str:
     """Heuristic to assign a meal_type from the meal name.
     
@@ -69,14 +118,9 @@ def infer_meal_type(name: str) -> str:
         One of 'breakfast', 'lunch', 'dinner', or 'snack'.
     """
     n = (name or "").lower()
-    if any(k in n for k in ("pancake", "omelette", "oatmeal", "yogurt", "breakfast")):
-        return "breakfast"
-    if any(k in n for k in ("salad", "sandwich", "wrap", "bowl", "tofu", "quinoa")):
-        return "lunch"
-    if any(k in n for k in ("stew", "curry", "steak", "salmon", "dinner", "pizza", "pasta")):
-        return "dinner"
-    if any(k in n for k in ("snack", "chips", "nuts", "hummus", "edamame", "fruit")):
-        return "snack"
+    for pattern, meal_type in MEAL_TYPE_PATTERNS:
+        if pattern.search(n):
+            return meal_type
     return "lunch"
 
 
@@ -107,9 +151,140 @@ def _truthy(val) -> bool:
         return False
 
 
+def _cell_to_float(val):
+    """Convert a nutrition cell to float; blank cells read as 0.0, bad ones as None."""
+    if val is None or str(val).strip() == "":
+        return 0.0
+    try:
+        return float(val)
+    except Exception:
+        return None
+
+
+def _raw_nutrient(df: pd.DataFrame, nutrient: str):
+    """Return one nutrition column as float64 plus a mask of unparseable cells.
+
+    Numeric columns are converted as a whole; object columns (mixed or
+    malformed cells) fall back to a per-cell conversion.
+    """
+    n = len(df)
+    if nutrient not in df.columns:
+        return np.zeros(n), np.zeros(n, dtype=bool)
+    if pd.api.types.is_numeric_dtype(df[nutrient]):
+        return df[nutrient].to_numpy(dtype=np.float64), np.zeros(n, dtype=bool)
+    cells = [_cell_to_float(v) for v in df[nutrient].tolist()]
+    bad = np.fromiter((c is None for c in cells), dtype=bool, count=n)
+    raw = np.array([0.0 if c is None else c for c in cells], dtype=np.float64)
+    return raw, bad
+
+
+def _nutrition_matrix(df: pd.DataFrame) -> np.ndarray:
+    """Return denormalized float64[N, 4] nutrition values in `NUTRIENTS` order.
+
+    All four columns are denormalized in one broadcast pass, then calories
+    are replaced by the macro-derived value (4 kcal/g protein, 4 kcal/g
+    carbs, 9 kcal/g fat) where the stated value is off by more than 15%.
+    Unparseable cells become 0.0, matching the historical row-wise parser.
+    """
+    raw, bad = zip(*(_raw_nutrient(df, n) for n in NUTRIENTS))
+    arr = np.column_stack(raw)
+    values = np.where(arr > 1.5, arr, _NUTRIENT_MIN + arr * (_NUTRIENT_MAX - _NUTRIENT_MIN))
+    values[np.column_stack(bad)] = 0.0
+
+    calories = values[:, 0]
+    calculated = values[:, 1] * 4 + values[:, 2] * 4 + values[:, 3] * 9
+    adjust = np.abs(calculated - calories) > calories * 0.15
+    logger.debug("Adjusting calories for %s meals to match their macros", int(adjust.sum()))
+    values[:, 0] = np.where(adjust, calculated, calories)
+    return values
+
+
+def _truthy_column(col: pd.Series) -> np.ndarray:
+    """Vectorized `_truthy` over a tag column."""
+    if pd.api.types.is_bool_dtype(col) or pd.api.types.is_numeric_dtype(col):
+        return (col.to_numpy(dtype=np.float64) >= 0.5)
+    return np.fromiter((_truthy(v) for v in col.tolist()), dtype=bool, count=len(col))
+
+
+def _parse_ingredients(val) -> list:
+    """Decode an ingredients cell holding a JSON list or comma-separated text."""
+    if not val:
+        return []
+    raw = str(val)
+    try:
+        return loads(raw)
+    except Exception:
+        return [i.strip() for i in raw.split(",") if i.strip()]
+
+
+def _read_csv_chunks(csv_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Yield the CSV in frames of up to `chunksize` rows.
+
+    Reads with `CSV_DTYPES` first; if a chunk has malformed numeric/tag
+    cells, the file is read again with inferred dtypes, which the
+    per-column cleanup in `_parse_frame` tolerates, and the records already
+    yielded are dropped. Records are counted by the parser rather than as
+    physical lines, so quoted fields spanning lines resume correctly.
+    """
+    options = dict(encoding="utf-8", engine="c", float_precision="round_trip", chunksize=chunksize)
+    done = 0
+    try:
+        with pd.read_csv(csv_path, dtype=CSV_DTYPES, **options) as reader:
+            for chunk in reader:
+                done += len(chunk)
+                yield chunk
+        return
+    except ValueError:
+        pass
+    with pd.read_csv(csv_path, **options) as reader:
+        for chunk in reader:
+            if done >= len(chunk):
+                done -= len(chunk)
+                continue
+            yield chunk.iloc[done:]
+            done = 0
+
+
+def iter_parse_meals_csv(csv_path: str, chunksize: int = CSV_CHUNK_SIZE) -> Iterator[List[Dict]]:
+    """Parse the CSV in chunks, yielding a list of meal dicts per chunk.
+
+    Peak memory is bounded by `chunksize` rows rather than the file size.
+
+    Args:
+        csv_path: Path to the meals CSV file.
+        chunksize: Maximum number of CSV rows per yielded batch.
+
+    Yields:
+        Lists of meal dictionaries, as returned by `parse_meals_csv`.
+    """
+    logger.info("Parsing meals CSV: %s", csv_path)
+    total = 0
+    for df in _read_csv_chunks(csv_path, chunksize):
+        meals = _parse_frame(df)
+        total += len(meals)
+        yield meals
+    logger.info("Parsed %s meals from CSV", total)
+
+
+def _parse_cache_path(csv_path: str) -> Optional[str]:
+    """Return the parse cache file of `csv_path` under `PARSE_CACHE_DIR`, or None."""
+    if not PARSE_CACHE_DIR:
+        return None
+    path = os.path.abspath(csv_path)
+    digest = hashlib.sha256(path.encode()).hexdigest()[:16]
+    return os.path.join(os.path.expanduser(PARSE_CACHE_DIR), f"{digest}-{os.path.basename(path)}{PARSE_CACHE_SUFFIX}")
+
+
 def parse_meals_csv(csv_path: str) -> List[Dict]:
     """Parse the CSV and return a list of normalized meal dictionaries.
     
+    Columns are processed as whole arrays rather than row by row. The result
+    is memoized as JSON in `PARSE_CACHE_DIR`, keyed on the CSV's mtime and
+    size, so repeated loads of an unchanged file skip parsing. The cache is
+    plain JSON, so a tampered file can at worst yield bad meal rows, never
+    run code, and it is replaced atomically, so readers never see a partial
+    write.
+
     Args:
         csv_path: Path to the meals CSV file.
         
@@ -117,89 +292,78 @@ def parse_meals_csv(csv_path: str) -> List[Dict]:
         List of meal dictionaries with keys: name, meal_type, calories,
         protein, carbs, fat, dietary_tags, ingredients.
     """
-    logger.info("Parsing meals CSV: %s", csv_path)
-    df = pd.read_csv(csv_path, encoding="utf-8", engine="python")
-    df = df.rename(columns=lambda s: s.strip())
-
-    meals = []
-    for _, row in df.iterrows():
-        name = row.get("meal_name") or row.get("name") or row.get("meal")
-        if not name or (isinstance(name, float) and math.isnan(name)):
-            continue
-        name = str(name).strip()
-
-        calories = row.get("calories")
-        protein = row.get("protein")
-        carbs = row.get("carbs")
-        fat = row.get("fat")
-        
-        # Parse and denormalize nutrition values
-        try:
-            calories_raw = float(calories) if not (calories is None or str(calories).strip() == "") else 0.0
-            calories = denormalize_nutrition(calories_raw, 'calories')
-        except Exception:
-            calories = 0.0
-        
+    st = os.stat(csv_path)
+    key = [PARSE_CACHE_VERSION, st.st_mtime_ns, st.st_size]
+    cache_path = _parse_cache_path(csv_path)
+    if cache_path is not None:
         try:
-            protein_raw = float(row.get("protein")) if not (row.get("protein") is None or str(row.get("protein")).strip() == "") else 0.0
-            protein = denormalize_nutrition(protein_raw, 'protein')
+            with open(cache_path, "rb") as f:
+                cached = loads(f.read())
+            meals = cached["meals"]
+            if cached["key"] == key:
+                logger.debug("Loaded %s parsed meals from %s", len(meals), cache_path)
+                return meals
         except Exception:
-            protein = 0.0
-            
-        try:
-            carbs_raw = float(row.get("carbs")) if not (row.get("carbs") is None or str(row.get("carbs")).strip() == "") else 0.0
-            carbs = denormalize_nutrition(carbs_raw, 'carbs')
-        except Exception:
-            carbs = 0.0
-            
+            pass
+
+    meals = [meal for batch in iter_parse_meals_csv(csv_path) for meal in batch]
+    if cache_path is not None:
         try:
-            fat_raw = float(row.get("fat")) if not (row.get("fat") is None or str(row.get("fat")).strip() == "") else 0.0
-            fat = denormalize_nutrition(fat_raw, 'fat')
-        except Exception:
-            fat = 0.0
-
-        # Build tags
-        tags = []
-        for t in KNOWN_TAGS:
-            if t in row.index and _truthy(row.get(t)):
-                tags.append(t)
-
-        # fallback: check for an 'is_healthy' or 'healthy' column with floating score
-        if ("is_healthy" in row.index and _truthy(row.get("is_healthy"))) and "is_healthy" not in tags:
-            tags.append("is_healthy")
-
-        meal_type = infer_meal_type(name)
-
-        ingredients = []
-        # if 'ingredients' column exists, try to parse a JSON-like or comma-separated list
-        if "ingredients" in row.index and row.get("ingredients"):
-            raw = str(row.get("ingredients"))
-            try:
-                import json
-
-                ingredients = json.loads(raw)
-            except Exception:
-                ingredients = [i.strip() for i in raw.split(",") if i.strip()]
-
-        # Recalculate calories from macros for consistency (4 kcal/g protein, 4 kcal/g carbs, 9 kcal/g fat)
-        calculated_calories = (protein * 4) + (carbs * 4) + (fat * 9)
-        # Use calculated calories if significantly different from stated
-        if abs(calculated_calories - calories) > calories * 0.15:
-            logger.debug(f"Adjusting calories for {name}: stated={calories:.1f}, calculated={calculated_calories:.1f}")
-            calories = calculated_calories
-        
-        meals.append({
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(cache_path),
+                                             suffix=".tmp", delete=False) as f:
+                f.write(dumps({"key": key, "meals": meals}))
+            os.replace(f.name, cache_path)
+        except OSError as e:
+            logger.debug("Could not write parse cache %s: %s", cache_path, e)
+    return meals
+
+
+def _parse_frame(df: pd.DataFrame) -> List[Dict]:
+    """Normalize one frame of raw CSV rows into meal dictionaries."""
+    df = df.rename(columns=lambda s: s.strip())
+
+    # first non-empty of meal_name/name/meal per row; NaN cells count as present
+    # and are dropped below, as the row-wise parser did
+    names = [None] * len(df)
+    for col in ("meal_name", "name", "meal"):
+        if col in df.columns:
+            names = [n if n else v for n, v in zip(names, df[col].tolist())]
+    keep = np.array(
+        [bool(n) and not (isinstance(n, float) and math.isnan(n)) for n in names], dtype=bool
+    )
+    df = df[keep]
+    names = [str(n).strip() for n, k in zip(names, keep) if k]
+
+    calories, protein, carbs, fat = _nutrition_matrix(df).T
+
+    tags = [[] for _ in names]
+    for t in sorted(KNOWN_TAGS):
+        if t in df.columns:
+            for i in np.flatnonzero(_truthy_column(df[t])):
+                tags[i].append(t)
+
+    if "ingredients" in df.columns:
+        ingredients = [_parse_ingredients(v) for v in df["ingredients"].tolist()]
+    else:
+        ingredients = [[] for _ in names]
+
+    meals = [
+        {
             "name": name,
-            "meal_type": meal_type,
-            "calories": round(calories, 1),
-            "protein": round(protein, 1),
-            "carbs": round(carbs, 1),
-            "fat": round(fat, 1),
-            "dietary_tags": tags,
-            "ingredients": ingredients,
-        })
-
-    logger.info("Parsed %s meals from CSV", len(meals))
+            "meal_type": infer_meal_type(name),
+            "calories": round(cal, 1),
+            "protein": round(pro, 1),
+            "carbs": round(carb, 1),
+            "fat": round(f, 1),
+            "dietary_tags": meal_tags,
+            "ingredients": meal_ingredients,
+        }
+        for name, cal, pro, carb, f, meal_tags, meal_ingredients in zip(
+            names, calories.tolist(), protein.tolist(), carbs.tolist(), fat.tolist(), tags, ingredients
+        )
+    ]
+
     return meals
 
 
@@ -207,7 +371,10 @@ def seed_meals_from_csv(csv_path: str, session=None):
     """Idempotently seed the meals table from the CSV file.
 
     If `session` is not supplied, a `WriteSessionLocal` session is used.
-    Existing meals are matched by name and skipped to avoid duplicates.
+    Existing meals are matched by name (looked up in chunked IN queries)
+    and skipped to avoid duplicates; new rows go in with one executemany
+    per CSV chunk and are committed together, so a failure part-way leaves
+    the table unchanged.
     
     Args:
         csv_path: Path to the meals CSV file.
@@ -221,28 +388,39 @@ def seed_meals_from_csv(csv_path: str, session=None):
         session = WriteSessionLocal()
         close_session = True
     try:
-        parsed = parse_meals_csv(csv_path)
         added = 0
-        for item in parsed:
-            existing = session.query(models.Meal).filter(models.Meal.name == item["name"]).first()
-            if existing:
-                continue
-            m = models.Meal(
-                name=item["name"],
-                meal_type=item["meal_type"],
-                calories=item["calories"],
-                protein=item["protein"],
-                carbs=item["carbs"],
-                fat=item["fat"],
-                dietary_tags="[" + ", ".join(f'"{t}"' for t in item.get("dietary_tags", [])) + "]",
-                ingredients="[]" if not item.get("ingredients") else str(item.get("ingredients")),
-            )
-            session.add(m)
-            added += 1
+        seen = set()
+        for parsed in iter_parse_meals_csv(csv_path):
+            names = list({item["name"] for item in parsed} - seen)
+            for i in range(0, len(names), NAME_LOOKUP_CHUNK):
+                chunk = names[i:i + NAME_LOOKUP_CHUNK]
+                seen.update(session.scalars(select(models.Meal.name).where(models.Meal.name.in_(chunk))))
+
+            rows = []
+            for item in parsed:
+                # also skips repeats within the CSV itself
+                if item["name"] in seen:
+                    continue
+                seen.add(item["name"])
+                rows.append({
+                    "name": item["name"],
+                    "meal_type": item["meal_type"],
+                    "calories": item["calories"],
+                    "protein": item["protein"],
+                    "carbs": item["carbs"],
+                    "fat": item["fat"],
+                    "dietary_tags": item.get("dietary_tags", []),
+                    "ingredients": item.get("ingredients") or [],
+                })
+            # one executemany per chunk, all inside a single transaction
+            added += save_rows(session, models.Meal, rows, commit=False)
         if added:
             session.commit()
         logger.info("Seeded %s new meals into DB", added)
         return added
+    except Exception:
+        session.rollback()
+        raise
     finally:
         if close_session:
             session.close()
@@ -1,6 +1,19 @@
+from core.serialization import dumps
+
 MEALS_DATA = [
     # Breakfasts
     {"name": "Oatmeal with Berries", "meal_type": "breakfast", "calories": 320, "protein": 12, "carbs": 58, "fat": 6, "dietary_tags": ["vegetarian","high-fiber"], "ingredients": ["oats","blueberries","almond milk","chia seeds"]},
     {"name": "Greek Yogurt Parfait", "meal_type": "breakfast", "calories": 260, "protein": 18, "carbs": 30, "fat": 6, "dietary_tags": ["vegetarian"], "ingredients": ["greek yogurt","honey","granola","strawberries"]},
     # ...rest omitted for brevity (already present in root meal_data)
 ]
+
+# Row mappings ready for insertion, with list columns JSON-encoded once at
+# import time rather than on every seeding run.
+MEALS_DATA_SEEDED = [
+    {
+        **item,
+        "dietary_tags": dumps(item.get("dietary_tags", [])),
+        "ingredients": dumps(item.get("ingredients", [])),
+    }
+    for item in MEALS_DATA
+]
@@ -5,11 +5,17 @@ creates tables and seeds the meals dataset when the DB is empty.
 """
 
 import os
-from sqlalchemy import create_engine
+import re
+from sqlalchemy import Integer, MetaData, String, create_engine, event, insert, inspect, select, text, type_coerce
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
-import json
-from .models import Base, Meal
-from data.meals_dataset import MEALS_DATA
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateTable
+from .models import Base, Meal, User
+from data.meals_dataset import MEALS_DATA_SEEDED
+from core.logger import get_logger
+
+logger = get_logger("database.database")
 
 # Read/Write partitioning pattern
 # In production, set WRITE_DATABASE_URL and READ_DATABASE_URL to different DB instances.
@@ -17,38 +23,188 @@ from data.meals_dataset import MEALS_DATA
 WRITE_DATABASE_URL = os.getenv("WRITE_DATABASE_URL", "sqlite:///diet.db")
 READ_DATABASE_URL = os.getenv("READ_DATABASE_URL", WRITE_DATABASE_URL)
 
+# Connection pool sizing. SQLAlchemy's defaults (5 + 10 overflow) are far
+# below the endpoint threadpool, so concurrent requests would block waiting
+# for a connection. Each pooled connection holds a file descriptor; raise
+# `ulimit -n` accordingly when increasing these.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "40"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+
+
+def _engine_kwargs(url: str, pool_size: int) -> dict:
+    """Build `create_engine` keyword arguments for the given database URL.
+
+    File databases get an explicit `QueuePool`, so connections (and the
+    pragmas applied on connect) are reused across requests regardless of
+    the dialect's default pool. In-memory SQLite uses a per-thread
+    singleton pool that has no size or overflow, so only the SQLite
+    connect args apply there.
+    """
+    kwargs = {}
+    if url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            return kwargs
+    kwargs.update(
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    return kwargs
+
+
+# Per-connection SQLite tuning. WAL lets readers proceed during a write and,
+# with synchronous=NORMAL, commits no longer fsync every time (a power loss
+# can drop the last transactions, but never corrupts the file).
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _apply_sqlite_pragmas(dbapi_conn, connection_record):
+    """`connect` event hook running `SQLITE_PRAGMAS` on a new connection."""
+    cursor = dbapi_conn.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def _create_engine(url: str, pool_size: int):
+    """Create an engine, installing the SQLite pragmas for file databases."""
+    engine = create_engine(url, **_engine_kwargs(url, pool_size))
+    if url.startswith("sqlite") and url not in ("sqlite://", "sqlite:///:memory:"):
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
 # Engines
-write_engine = create_engine(WRITE_DATABASE_URL, connect_args={"check_same_thread": False})
-read_engine = create_engine(READ_DATABASE_URL, connect_args={"check_same_thread": False})
+write_engine = _create_engine(WRITE_DATABASE_URL, DB_POOL_SIZE)
+read_engine = _create_engine(READ_DATABASE_URL, DB_READ_POOL_SIZE)
 
 # Session factories
 WriteSessionLocal = sessionmaker(bind=write_engine)
 ReadSessionLocal = sessionmaker(bind=read_engine)
 
 
+ENCODED_USER_COLUMNS = ("gender", "activity_level", "dietary_preference", "health_goal")
+
+
+def _legacy_label(value, column_type):
+    """Map a value stored by the pre-`EnumCode` schema to its label, or None.
+
+    Labels are matched ignoring case, surrounding whitespace and the word
+    separator (``'weight loss'`` matches ``'weight_loss'``); bare digits are
+    codes written through the new type into the old VARCHAR column.
+    """
+    if value is None:
+        return None
+    label = re.sub(r"[\s_-]+", column_type.label_sep, str(value).strip().lower())
+    if label.isdigit():
+        return column_type.labels.get(int(label))
+    return label if label in column_type.codes else None
+
+
+def migrate_user_enum_columns(session) -> bool:
+    """Rebuild a pre-`EnumCode` `users` table with SMALLINT profile columns.
+
+    Databases created before these columns were encoded hold them as
+    VARCHAR. Such a table is copied into a new one created from the model,
+    so constraints and types match a fresh database, and then swapped in
+    (SQLite's documented table-rebuild procedure). If the columns are
+    already numeric nothing is touched, so later calls only inspect the
+    schema.
+
+    Raises:
+        RuntimeError: If any row holds a value that maps to no label; the
+            table is left unchanged and the offending values are listed.
+
+    Returns:
+        True if the table was rebuilt.
+    """
+    conn = session.connection()
+    columns = {c["name"]: c["type"] for c in inspect(conn).get_columns("users")}
+    if all(isinstance(columns.get(name), Integer) for name in ENCODED_USER_COLUMNS):
+        return False
+
+    table = User.__table__
+    names = [c.name for c in table.columns if c.name in columns]
+    # coded columns are read as raw text; the others keep their own types
+    query = select(*[
+        type_coerce(table.c[name], String).label(name) if name in ENCODED_USER_COLUMNS else table.c[name]
+        for name in names
+    ])
+    rows = []
+    invalid = []
+    for row in conn.execute(query).mappings():
+        row = dict(row)
+        for name in ENCODED_USER_COLUMNS:
+            label = _legacy_label(row[name], table.c[name].type)
+            if label is None:
+                invalid.append(f"users.id={row['id']} {name}={row[name]!r}")
+            row[name] = label
+        rows.append(row)
+    if invalid:
+        raise RuntimeError(
+            f"Cannot migrate {len(invalid)} users profile values; fix or delete these rows first: "
+            + ", ".join(invalid[:20])
+        )
+
+    rebuilt = table.to_metadata(MetaData(), name="users__rebuild")
+    conn.execute(text("DROP TABLE IF EXISTS users__rebuild"))
+    conn.execute(CreateTable(rebuilt))
+    if rows:
+        conn.execute(insert(rebuilt), rows)
+    conn.execute(text("DROP TABLE users"))
+    conn.execute(text("ALTER TABLE users__rebuild RENAME TO users"))
+    for index in table.indexes:
+        index.create(conn)
+    logger.info("Rebuilt users table with coded profile columns (%d rows)", len(rows))
+    return True
+
+
+def ensure_meal_name_index(session):
+    """Create the unique `meals.name` index on databases created without it.
+
+    `create_all` only builds indexes for new tables. If existing rows hold
+    duplicate names the index cannot be created; that is logged and the
+    table is left as is, since seeding still dedups by name.
+    """
+    try:
+        session.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_meals_name ON meals (name)"))
+        session.commit()
+    except SQLAlchemyError:
+        session.rollback()
+        logger.warning("Could not create unique index ix_meals_name; meals.name has duplicates")
+
+
 def init_db():
     """Initialize database schema and seed meals.
     
-    Creates all tables using SQLAlchemy models and populates the meals
-    table with default data if the table is empty.
+    Creates all tables using SQLAlchemy models, adds the `meals.name`
+    index to older databases, rebuilds a pre-`EnumCode` `users` table
+    (a no-op once its profile columns are numeric) and populates the meals table with
+    default data if the table is empty.
     """
     Base.metadata.create_all(bind=write_engine)
     session = WriteSessionLocal()
     try:
-        count = session.query(Meal).count()
-        if count == 0:
-            for item in MEALS_DATA:
-                m = Meal(
-                    name=item['name'],
-                    meal_type=item['meal_type'],
-                    calories=item['calories'],
-                    protein=item['protein'],
-                    carbs=item['carbs'],
-                    fat=item['fat'],
-                    dietary_tags=json.dumps(item.get('dietary_tags', [])),
-                    ingredients=json.dumps(item.get('ingredients', [])),
-                )
-                session.add(m)
+        ensure_meal_name_index(session)
+        migrate_user_enum_columns(session)
+        session.commit()
+        if session.execute(select(Meal.id).limit(1)).first() is None:
+            session.execute(insert(Meal), MEALS_DATA_SEEDED)
             session.commit()
     finally:
         session.close()
@@ -5,17 +5,58 @@ application: User, Meal, MealPlan and Feedback. Models are simple SQLAlchemy
 declarative classes and intentionally keep behavior-free (no business logic).
 """
 
+from enum import IntEnum
 from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
+from .types import EnumCode, JSONList
 
 Base = declarative_base()
 
 
+class Gender(IntEnum):
+    """Stored codes for `User.gender`."""
+
+    MALE = 1
+    FEMALE = 2
+
+
+class ActivityLevel(IntEnum):
+    """Stored codes for `User.activity_level`."""
+
+    SEDENTARY = 1
+    LIGHTLY_ACTIVE = 2
+    MODERATELY_ACTIVE = 3
+    VERY_ACTIVE = 4
+    EXTREMELY_ACTIVE = 5
+
+
+class HealthGoal(IntEnum):
+    """Stored codes for `User.health_goal`."""
+
+    WEIGHT_LOSS = 1
+    MUSCLE_GAIN = 2
+    MAINTAIN = 3
+
+
+class DietaryPreference(IntEnum):
+    """Stored codes for `User.dietary_preference` (labels use hyphens)."""
+
+    BALANCED = 1
+    KETO = 2
+    VEGETARIAN = 3
+    VEGAN = 4
+    PALEO = 5
+    MEDITERRANEAN = 6
+    HIGH_PROTEIN = 7
+
+
 class User(Base):
     """ORM model representing an application user.
 
     Attributes correspond to user profile and calculated nutrition targets.
+    The profile enums are stored as SmallInteger codes but read and written
+    as their string labels.
     """
 
     __tablename__ = "users"
@@ -24,10 +65,10 @@ class User(Base):
     age = Column(Integer, nullable=False)
     height = Column(Float, nullable=False)
     weight = Column(Float, nullable=False)
-    gender = Column(String, nullable=False)
-    activity_level = Column(String, nullable=False)
-    dietary_preference = Column(String, nullable=False)
-    health_goal = Column(String, nullable=False)
+    gender = Column(EnumCode(Gender), nullable=False)
+    activity_level = Column(EnumCode(ActivityLevel), nullable=False)
+    dietary_preference = Column(EnumCode(DietaryPreference, label_sep="-"), nullable=False)
+    health_goal = Column(EnumCode(HealthGoal), nullable=False)
     allergies = Column(Text, nullable=True)
     target_calories = Column(Float, nullable=True)
     target_protein = Column(Float, nullable=True)
@@ -39,19 +80,19 @@ class User(Base):
 class Meal(Base):
     """ORM model representing an individual meal option.
 
-    Dietary tags and ingredients are stored as JSON-encoded strings.
+    Dietary tags and ingredients are stored as JSON text and load as lists.
     """
 
     __tablename__ = "meals"
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, unique=True, index=True)
     meal_type = Column(String, nullable=False)
     calories = Column(Float, nullable=False)
     protein = Column(Float, nullable=False)
     carbs = Column(Float, nullable=False)
     fat = Column(Float, nullable=False)
-    dietary_tags = Column(Text, nullable=True)
-    ingredients = Column(Text, nullable=True)
+    dietary_tags = Column(JSONList, nullable=True)
+    ingredients = Column(JSONList, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
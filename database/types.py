@@ -0,0 +1,76 @@
+"""Custom SQLAlchemy column types.
+
+`EnumCode` stores a small, known vocabulary of strings as SmallInteger
+codes while the ORM keeps handing plain strings to the rest of the app,
+so services and schemas compare and serialize the same values as before.
+
+`JSONList` stores lists as JSON text and hands back decoded lists, so
+meal tags and ingredients are parsed once at load time instead of by
+every consumer.
+"""
+
+from enum import IntEnum
+from typing import Dict, Type
+from sqlalchemy import SmallInteger, Text
+from sqlalchemy.types import TypeDecorator
+from core.serialization import dumps, parse_list
+
+
+class EnumCode(TypeDecorator):
+    """String column persisted as the integer code of an `IntEnum`.
+
+    Each member's label is its lowercased name, with `_` replaced by
+    `label_sep` (e.g. ``HIGH_PROTEIN`` -> ``'high-protein'``).
+
+    Writing a value outside the vocabulary raises `ValueError`; requests are
+    validated against the same labels, so this only guards other writers.
+    Text in the column reads back unchanged; `migrate_user_enum_columns`
+    converts the labels of pre-encoding databases, so only rows written
+    around this type can hold any.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_cls: Type[IntEnum], label_sep: str = "_"):
+        super().__init__()
+        self.enum_cls = enum_cls
+        self.label_sep = label_sep
+        self.codes: Dict[str, int] = {m.name.lower().replace("_", label_sep): int(m) for m in enum_cls}
+        self.labels: Dict[int, str] = {code: label for label, code in self.codes.items()}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        code = self.codes.get(value)
+        if code is None:
+            raise ValueError(f"{value!r} is not a valid {self.enum_cls.__name__} label")
+        return code
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return value
+        return self.labels.get(value, value)
+
+
+class JSONList(TypeDecorator):
+    """List column persisted as JSON text.
+
+    Lists are encoded with orjson on write; strings are assumed to be
+    already-encoded JSON and stored as is. Loads go through `parse_list`,
+    so NULLs, malformed values and Python list literals written by older
+    seeding code all come back as lists instead of raising.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return dumps(list(value))
+
+    def process_result_value(self, value, dialect):
+        return parse_list(value)
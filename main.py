@@ -2,31 +2,46 @@
 
 Defines FastAPI app, middleware, exception handlers and includes API
 routers from the `api` package. The `lifespan` handler initializes the DB
-on startup.
+and loads the shared meal snapshots on startup.
 """
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 from datetime import datetime, date
 from typing import List, Optional
-import json
+import os
+import time
 from contextlib import asynccontextmanager
+import anyio.to_thread
 
-from database import init_db, models
+from database import init_db, models, ReadSessionLocal
 from schemas import UserCreateRequest, UserWithMealPlanResponse, AllUsersResponse, MealDetail
 from core.exceptions import DatabaseError
 import services.recommendation_engine as re
+from services.content_recommender import content_recommender
+from services.meal_source import get_meal_catalog
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Fastapi lifespan context: initialize resources before serving requests."""
     # Initialize database on startup
     init_db()
+    # Build the shared meals catalog and similarity features now, so the
+    # first requests reuse them instead of scanning the meals table
+    with ReadSessionLocal() as db:
+        get_meal_catalog(db)
+        content_recommender.warm(db)
+    # Sync endpoints run on anyio's worker threads (40 by default); size the
+    # pool so blocking DB calls don't queue behind each other under load
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = int(os.getenv("THREADPOOL_SIZE", "100"))
     yield
 
 
-app = FastAPI(title="Diet Recommendation API", version="1.0.0", lifespan=lifespan)
+app = FastAPI(title="Diet Recommendation API", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
 app.add_middleware(
@@ -67,15 +82,28 @@ async def log_requests(request: Request, call_next):
         raise
 
 
+# Seconds a successful deep health check is reused before querying again
+HEALTH_DEEP_TTL = 5.0
+_deep_health_checked_at = 0.0
+
+
 @app.get("/health")
-def health(db: Session = Depends(get_db_read)):
+def health(deep: bool = False, db: Session = Depends(get_db_read)):
     """Return basic health status and database connectivity.
+
+    The default check only runs `SELECT 1` on a pooled connection. With
+    `?deep=1` it also reads from the meals table; a successful deep result
+    is reused for `HEALTH_DEEP_TTL` seconds.
     
     Raises:
         DatabaseError: If database connection fails.
     """
+    global _deep_health_checked_at
     try:
-        _ = db.query(models.Meal).first()
+        db.execute(text("SELECT 1"))
+        if deep and time.monotonic() - _deep_health_checked_at >= HEALTH_DEEP_TTL:
+            db.execute(select(models.Meal.id).limit(1))
+            _deep_health_checked_at = time.monotonic()
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         logger.exception("Health check failed")
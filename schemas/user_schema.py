@@ -1,7 +1,14 @@
 """Schemas for user-related requests and responses."""
 
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal, Optional
+
+# Labels of the enums the `users` profile columns are stored as
+# (`database.models.Gender`, `ActivityLevel`, `DietaryPreference`, `HealthGoal`)
+GenderLabel = Literal["male", "female"]
+ActivityLevelLabel = Literal["sedentary", "lightly_active", "moderately_active", "very_active", "extremely_active"]
+DietaryPreferenceLabel = Literal["balanced", "keto", "vegetarian", "vegan", "paleo", "mediterranean", "high-protein"]
+HealthGoalLabel = Literal["weight_loss", "muscle_gain", "maintain"]
 
 
 class UserCreateRequest(BaseModel):
@@ -11,13 +18,19 @@ class UserCreateRequest(BaseModel):
     age: int = Field(..., ge=18, le=100, examples=[30], description="Age in years (18-100)")
     height: float = Field(..., ge=100, le=250, examples=[175.0], description="Height in centimeters (100-250)")
     weight: float = Field(..., ge=30, le=300, examples=[75.0], description="Weight in kilograms (30-300)")
-    gender: str = Field(..., examples=["male"], description="Gender (male/female)")
-    activity_level: str = Field(..., examples=["moderately_active"], description="Activity level: sedentary, lightly_active, moderately_active, very_active, extremely_active")
-    dietary_preference: str = Field(..., examples=["balanced"], description="Dietary preference: balanced, keto, vegetarian, vegan, paleo, mediterranean, high-protein")
-    health_goal: str = Field(..., examples=["maintain"], description="Health goal: weight_loss, muscle_gain, maintain")
+    gender: GenderLabel = Field(..., examples=["male"], description="Gender (male/female)")
+    activity_level: ActivityLevelLabel = Field(..., examples=["moderately_active"], description="Activity level: sedentary, lightly_active, moderately_active, very_active, extremely_active")
+    dietary_preference: DietaryPreferenceLabel = Field(..., examples=["balanced"], description="Dietary preference: balanced, keto, vegetarian, vegan, paleo, mediterranean, high-protein")
+    health_goal: HealthGoalLabel = Field(..., examples=["maintain"], description="Health goal: weight_loss, muscle_gain, maintain")
     allergies: Optional[List[str]] = Field(default=[], examples=[["peanuts", "shellfish"]], description="List of food allergies")
     use_csv: Optional[bool] = Field(default=False, examples=[False], description="If true, source meals from CSV fixtures instead of database")
 
+    @field_validator("gender", "activity_level", "dietary_preference", "health_goal", mode="before")
+    @classmethod
+    def _normalize_label(cls, value):
+        """Accept labels regardless of surrounding whitespace and case."""
+        return value.strip().lower() if isinstance(value, str) else value
+
 
 class UserWithMealPlanResponse(BaseModel):
     """Response returned after creating a user with a generated meal plan."""
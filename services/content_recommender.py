@@ -3,21 +3,52 @@
 Provides a simple content-based recommender which vectorizes meals using
 nutritional features (calories, protein, carbs, fat) and binary dietary tags,
 then computes cosine similarity to recommend meals similar to a given meal.
+The L2-normalized features are cached between calls and rebuilt only when
+the meals table changes; binary tag features are kept packed as bits, with
+their dot products computed as popcounts of the shared bits. The shared
+recommender also persists them to `content_features.npz` in
+`CONTENT_FEATURES_CACHE_DIR`, keyed on a hash of the meal columns they are
+built from, so a restarted process skips the rebuild while those are
+unchanged.
 
 This module is intentionally lightweight and used for quick content-based
 recommendations before feedback-based models are available.
 """
 
-from typing import List, Tuple
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import os
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from database import models
 from core.logger import get_logger
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-import json
+from core.serialization import dumps, parse_list
 
 logger = get_logger("services.content_recommender")
 
+# Directory the shared recommender persists its features in; an empty value
+# disables persistence.
+CONTENT_FEATURES_CACHE_DIR = os.getenv(
+    "CONTENT_FEATURES_CACHE_DIR",
+    os.path.join(os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "dietitian"),
+)
+FEATURES_PATH = Path(CONTENT_FEATURES_CACHE_DIR).expanduser() / "content_features.npz" if CONTENT_FEATURES_CACHE_DIR else None
+
+# Meal columns the features are built from
+_FEATURE_COLUMNS = (
+    models.Meal.id,
+    models.Meal.calories,
+    models.Meal.protein,
+    models.Meal.carbs,
+    models.Meal.fat,
+    models.Meal.dietary_tags,
+)
+
+# Set bits per byte value, for popcounts over packed tag rows
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
 
 class ContentBasedRecommender:
     """Content-based recommender using nutritional vectors and dietary tags.
@@ -30,9 +61,17 @@ class ContentBasedRecommender:
         Return a list of (meal_id, score) tuples for the top-k similar meals.
     """
 
-    def __init__(self):
-        """Initialize the content-based recommender instance."""
+    def __init__(self, features_path: Optional[Path] = None):
+        """Initialize the content-based recommender instance.
+
+        Args:
+            features_path: Optional `.npz` file in which to persist the
+                similarity features across restarts.
+        """
         self.logger = logger
+        self.features_path = features_path
+        # (token, num, tag_bits, inv_norms, ids, id_to_idx) for the last meals snapshot
+        self._cache = None
 
     def _vectorize_meals(self, meals: List[models.Meal]):
         """Convert meals into a numeric feature matrix and corresponding ids.
@@ -50,37 +89,119 @@ class ContentBasedRecommender:
         all_tags = set()
         parsed = []
         for m in meals:
-            tags = []
-            try:
-                tags = json.loads(m.dietary_tags) if m.dietary_tags else []
-            except Exception:
-                # fallback if tags stored as string list repr
-                try:
-                    tags = eval(m.dietary_tags)
-                except Exception:
-                    tags = []
+            # ORM rows already hold lists; JSON text and list literals also decode
+            tags = parse_list(m.dietary_tags)
             parsed.append((m, tags))
             all_tags.update(tags)
 
-        tag_list = sorted(list(all_tags))
-        features = []
-        ids = []
-        for (m, tags) in parsed:
-            num_feats = [m.calories or 0.0, m.protein or 0.0, m.carbs or 0.0, m.fat or 0.0]
-            tag_feats = [1.0 if t in tags else 0.0 for t in tag_list]
-            vec = num_feats + tag_feats
-            features.append(vec)
-            ids.append(m.id)
-
-        X = np.array(features, dtype=float)
+        # tag columns follow the 4 numeric ones; each meal's tags become
+        # (row, column) coordinates set in one scatter instead of a dense
+        # per-meal list over every known tag
+        tag_col = {t: 4 + j for j, t in enumerate(sorted(all_tags))}
+        ids = [m.id for m, _ in parsed]
+        X = np.zeros((len(parsed), 4 + len(tag_col)))
+        for i, (m, _) in enumerate(parsed):
+            X[i, :4] = (m.calories or 0.0, m.protein or 0.0, m.carbs or 0.0, m.fat or 0.0)
+        rows = [i for i, (_, tags) in enumerate(parsed) for _ in tags]
+        cols = [tag_col[t] for _, tags in parsed for t in tags]
+        X[rows, cols] = 1.0
+
         # normalize numeric columns to unit scale to avoid domination by calories
         if X.shape[0] > 0:
             num_cols = 4
-            col_max = X[:, :num_cols].max(axis=0)
-            col_max[col_max == 0] = 1.0
-            X[:, :num_cols] = X[:, :num_cols] / col_max
+            num = X[:, :num_cols]
+            col_max = num.max(axis=0)
+            # in place; all-zero columns are left as they are
+            np.divide(num, col_max, out=num, where=col_max != 0)
         return X, ids
 
+    def _cache_token(self, db: Session):
+        """Return a cheap token that changes whenever meals are added or removed.
+
+        Meals are only ever inserted by seeding, so the row count and highest
+        id identify a snapshot without loading the rows.
+        """
+        return tuple(db.query(func.count(models.Meal.id), func.max(models.Meal.id)).one())
+
+    def _get_features(self, db: Session):
+        """Return the cached similarity features of the current meals.
+
+        Rebuilt only when :meth:`_cache_token` changes. The feature rows of
+        :meth:`_vectorize_meals` are split into their numeric part, scaled
+        by the row's inverse L2 norm and stored as float32, and their binary
+        tag part, packed 8 tags per byte. The cosine of two meals is then
+        ``num_a . num_b + popcount(tags_a & tags_b) * inv_a * inv_b``.
+
+        Returns:
+            Tuple (num, tag_bits, inv_norms, ids, id_to_idx).
+        """
+        token = self._cache_token(db)
+        cache = self._cache
+        if cache is not None and cache[0] == token:
+            return cache[1:]
+        meals = db.query(*_FEATURE_COLUMNS).all()
+        key = self._persist_key(meals)
+        features = self._load_features(key)
+        if features is None:
+            features = self._build_features(meals)
+            self._save_features(key, features)
+        num, tag_bits, inv_norms, ids = features
+        id_to_idx = {mid: i for i, mid in enumerate(ids)}
+        self._cache = (token, num, tag_bits, inv_norms, ids, id_to_idx)
+        return self._cache[1:]
+
+    def _build_features(self, meals):
+        """Vectorize the `_FEATURE_COLUMNS` rows into (num, tag_bits, inv_norms, ids)."""
+        X, ids = self._vectorize_meals(meals)
+        norms = np.linalg.norm(X, axis=1)
+        norms[norms == 0] = 1.0
+        inv_norms = (1.0 / norms).astype(np.float32)
+        num = (X[:, :4] * inv_norms[:, None]).astype(np.float32)
+        tag_bits = np.packbits(X[:, 4:] > 0, axis=1)
+        return num, tag_bits, inv_norms, ids
+
+    def _persist_key(self, meals) -> Optional[str]:
+        """Identify a meals snapshot across processes by hashing its feature columns.
+
+        Any edit to a meal's macros or tags changes the key, unlike the
+        in-process token, which only tracks inserts.
+        """
+        if self.features_path is None:
+            return None
+        rows = [[m.id, m.calories, m.protein, m.carbs, m.fat, parse_list(m.dietary_tags)] for m in meals]
+        return hashlib.sha256(dumps(rows).encode()).hexdigest()
+
+    def _load_features(self, key: Optional[str]):
+        """Return persisted features saved under `key`, or None."""
+        if key is None:
+            return None
+        try:
+            with np.load(self.features_path) as data:
+                if str(data["key"]) != key:
+                    return None
+                return data["num"], data["tag_bits"], data["inv_norms"], data["ids"].tolist()
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _save_features(self, key: Optional[str], features) -> None:
+        """Persist features under `key`; failures only cost the next cold start."""
+        if key is None:
+            return
+        num, tag_bits, inv_norms, ids = features
+        tmp = self.features_path.with_suffix(".tmp.npz")
+        try:
+            self.features_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                np.savez(f, key=np.array(key), num=num, tag_bits=tag_bits, inv_norms=inv_norms,
+                         ids=np.array(ids, dtype=np.int64))
+            os.replace(tmp, self.features_path)
+        except OSError as e:
+            self.logger.warning("Could not persist content features to %s: %s", self.features_path, e)
+
+    def warm(self, db: Session) -> None:
+        """Build (or load the persisted) similarity features ahead of the first request."""
+        self._get_features(db)
+
     def recommend_similar(self, db: Session, meal_id: int, top_k: int = 5) -> List[Tuple[int, float]]:
         """Return the top-k most similar meals to the specified meal.
 
@@ -96,20 +217,26 @@ class ContentBasedRecommender:
         Returns:
             List[Tuple[int, float]]: Ordered list of (meal_id, score) pairs.
         """
-        meals = db.query(models.Meal).all()
-        if not meals:
+        num, tag_bits, inv_norms, ids, id_to_idx = self._get_features(db)
+        if not ids:
             return []
-        X, ids = self._vectorize_meals(meals)
-        if meal_id not in ids:
+        idx = id_to_idx.get(meal_id)
+        if idx is None:
             self.logger.warning("meal_id %s not found for similarity", meal_id)
             return []
-        idx = ids.index(meal_id)
-        sims = cosine_similarity(X)
-        row = sims[idx]
-        # get top k excluding self
-        ranked = [(ids[i], float(row[i])) for i in range(len(ids)) if i != idx]
-        ranked.sort(key=lambda x: x[1], reverse=True)
-        return ranked[:top_k]
+        shared_tags = _POPCOUNT8[tag_bits & tag_bits[idx]].sum(axis=1, dtype=np.float32)
+        row = num @ num[idx] + shared_tags * inv_norms * inv_norms[idx]
+        row[idx] = -np.inf  # exclude self
+        k = min(max(top_k, 0), len(ids) - 1)
+        if k == 0:
+            return []
+        # k-th best score; among meals tied at it keep the earliest rows
+        kth = -np.partition(-row, k - 1)[k - 1]
+        above = np.flatnonzero(row > kth)
+        top = np.concatenate((above, np.flatnonzero(row == kth)[:k - len(above)]))
+        # highest score first, ties in table order
+        top = top[np.lexsort((top, -row[top]))]
+        return [(ids[i], float(row[i])) for i in top]
 
 
-content_recommender = ContentBasedRecommender()
+content_recommender = ContentBasedRecommender(features_path=FEATURES_PATH)
@@ -7,12 +7,14 @@ This module provides:
 """
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
+import math
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
@@ -28,6 +30,31 @@ MODELS_DIR = Path(__file__).resolve().parents[1] / "data" / "models"
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 MODEL_PATH = MODELS_DIR / "diet_model.joblib"
 
+# pyarrow is optional: when installed, pandas parses the training CSV with
+# Arrow's multithreaded reader; otherwise the C parser is used.
+try:
+    import pyarrow  # noqa: F401
+    CSV_READ_OPTIONS = {"engine": "pyarrow"}
+except ImportError:
+    CSV_READ_OPTIONS = {"engine": "c", "float_precision": "round_trip"}
+
+# Profile fields used as model features, in training column order
+FEATURE_COLUMNS = (
+    "Age",
+    "Gender",
+    "Weight_kg",
+    "Height_cm",
+    "Physical_Activity_Level",
+    "Daily_Caloric_Intake",
+    "Dietary_Restrictions",
+    "Allergies",
+    "Preferred_Cuisine",
+    "Weekly_Exercise_Hours",
+)
+NUMERIC_FEATURES = ("Age", "Weight_kg", "Height_cm", "Daily_Caloric_Intake", "Weekly_Exercise_Hours")
+TARGET_COLUMN = "Diet_Recommendation"
+PREDICT_CACHE_SIZE = 1024
+
 
 def _preprocess_frame(df: pd.DataFrame) -> pd.DataFrame:
     """Normalize and select features from the raw CSV DataFrame.
@@ -42,20 +69,7 @@ def _preprocess_frame(df: pd.DataFrame) -> pd.DataFrame:
     df = df.rename(columns=lambda s: s.strip())
 
     # Select a subset of columns we will use as features
-    candidates = [
-        "Age",
-        "Gender",
-        "Weight_kg",
-        "Height_cm",
-        "Physical_Activity_Level",
-        "Daily_Caloric_Intake",
-        "Dietary_Restrictions",
-        "Allergies",
-        "Preferred_Cuisine",
-        "Weekly_Exercise_Hours",
-    ]
-
-    available = [c for c in candidates if c in df.columns]
+    available = [c for c in FEATURE_COLUMNS if c in df.columns]
     X = df[available].copy()
 
     # Normalize categorical missing values
@@ -63,19 +77,34 @@ def _preprocess_frame(df: pd.DataFrame) -> pd.DataFrame:
         X[c] = X[c].fillna("Unknown").astype(str)
 
     # Numeric conversions
-    for c in ["Age", "Weight_kg", "Height_cm", "Daily_Caloric_Intake", "Weekly_Exercise_Hours"]:
+    for c in NUMERIC_FEATURES:
         if c in X.columns:
             X[c] = pd.to_numeric(X[c], errors="coerce")
 
     return X
 
 
+def _read_training_csv(csv_path: str) -> pd.DataFrame:
+    """Read only the feature and label columns of a training CSV.
+
+    The header is read first so that `usecols` can name just the columns
+    training uses (matched after stripping whitespace, as
+    `_preprocess_frame` does). Every other column is skipped by the parser
+    instead of being converted and then dropped.
+    """
+    wanted = set(FEATURE_COLUMNS) | {TARGET_COLUMN}
+    header = pd.read_csv(csv_path, encoding="utf-8", nrows=0).columns
+    usecols = [c for c in header if c.strip() in wanted]
+    return pd.read_csv(csv_path, encoding="utf-8", usecols=usecols, **CSV_READ_OPTIONS)
+
+
 def train_from_csv(csv_path: str, test_size: float = 0.2, random_state: int = 42) -> Dict[str, Any]:
-    """Train a RandomForest classifier on the provided CSV file.
+    """Train a histogram gradient-boosting classifier on the provided CSV file.
 
     The pipeline uses a ColumnTransformer to impute numeric features and
-    one-hot-encode categorical features. The entire sklearn pipeline is
-    persisted to `data/models/diet_model.joblib`.
+    one-hot-encode categorical features (densely, as the classifier
+    requires). The entire sklearn pipeline is persisted to
+    `data/models/diet_model.joblib`.
 
     Args:
         csv_path: Path to training CSV file.
@@ -89,13 +118,13 @@ def train_from_csv(csv_path: str, test_size: float = 0.2, random_state: int = 42
         ValueError: If CSV missing 'Diet_Recommendation' column.
     """
     logger.info("Loading CSV for training: %s", csv_path)
-    df = pd.read_csv(csv_path, encoding="utf-8", engine="python")
+    df = _read_training_csv(csv_path)
 
-    if "Diet_Recommendation" not in df.columns:
+    if TARGET_COLUMN not in df.columns:
         raise ValueError("CSV must contain 'Diet_Recommendation' column")
 
     X = _preprocess_frame(df)
-    y = df["Diet_Recommendation"].astype(str).fillna("Unknown")
+    y = df[TARGET_COLUMN].astype(str).fillna("Unknown")
 
     # Split
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=y)
@@ -111,7 +140,7 @@ def train_from_csv(csv_path: str, test_size: float = 0.2, random_state: int = 42
 
     categorical_transformer = Pipeline(steps=[
         ("imputer", SimpleImputer(strategy="constant", fill_value="Unknown")),
-        ("onehot", OneHotEncoder(handle_unknown="ignore"))
+        ("onehot", OneHotEncoder(handle_unknown="ignore", sparse_output=False))
     ])
 
     preprocessor = ColumnTransformer(transformers=[
@@ -121,13 +150,15 @@ def train_from_csv(csv_path: str, test_size: float = 0.2, random_state: int = 42
 
     clf = Pipeline(steps=[
         ("pre", preprocessor),
-        ("clf", RandomForestClassifier(n_estimators=100, random_state=random_state))
+        ("clf", HistGradientBoostingClassifier(random_state=random_state))
     ])
 
     clf.fit(X_train, y_train)
 
     # Persist the pipeline
     joblib.dump(clf, MODEL_PATH)
+    _load_model_version.cache_clear()
+    _predict_row.cache_clear()
     logger.info("Saved trained model to %s", MODEL_PATH)
 
     # Evaluate
@@ -155,11 +186,71 @@ def load_model() -> Optional[Pipeline]:
     return None
 
 
+@lru_cache(maxsize=1)
+def _load_model_version(mtime_ns: int) -> Pipeline:
+    """Unpickle the model once per file version; `mtime_ns` is the cache key."""
+    logger.info("Loading model from %s", MODEL_PATH)
+    return joblib.load(MODEL_PATH)
+
+
+def _to_number(value: Any) -> float:
+    """Scalar `pd.to_numeric(..., errors="coerce")`: NaN for missing or unparseable values."""
+    if value is None or isinstance(value, bool):
+        return math.nan
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return math.nan
+
+
+def _profile_row(profile: Any) -> Tuple:
+    """Return a profile's feature values in `FEATURE_COLUMNS` order.
+
+    Applies the same normalization as `_preprocess_frame` does to a one-row
+    frame: numeric fields are coerced to numbers (NaN when missing), and
+    categorical fields become strings, with missing values as ``"Unknown"``.
+    The result is hashable, so it doubles as the prediction cache key.
+    """
+    row = []
+    for c in FEATURE_COLUMNS:
+        value = profile.get(c) if isinstance(profile, dict) else None
+        if c in NUMERIC_FEATURES:
+            row.append(_to_number(value))
+        elif value is None or (isinstance(value, float) and math.isnan(value)):
+            row.append("Unknown")
+        else:
+            row.append(str(value))
+    return tuple(row)
+
+
+@lru_cache(maxsize=PREDICT_CACHE_SIZE)
+def _predict_row(mtime_ns: int, row: Tuple) -> Tuple[str, float, Tuple[Tuple[str, float], ...]]:
+    """Predict one normalized profile row with the model file version `mtime_ns`.
+
+    Runs the fitted preprocessor and classifier directly on a one-row frame
+    of the model's input columns, skipping `_preprocess_frame`.
+    """
+    model = _load_model_version(mtime_ns)
+    pre = model.named_steps["pre"]
+    clf = model.named_steps["clf"]
+    X = pd.DataFrame([row], columns=FEATURE_COLUMNS)[list(pre.feature_names_in_)]
+    probs = clf.predict_proba(pre.transform(X))[0]
+    idx = int(np.argmax(probs))
+    return (
+        str(clf.classes_[idx]),
+        float(probs[idx]),
+        tuple((str(c), float(p)) for c, p in zip(clf.classes_, probs)),
+    )
+
+
 def predict_from_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
     """Predict diet recommendation from a single profile dictionary.
 
     The profile should contain the same feature keys as used in training.
-    Missing keys are automatically filled with None before transformation.
+    Missing keys are treated as missing values. Predictions are cached per
+    model file version, so repeated profiles skip the model entirely.
     
     Args:
         profile: Dictionary containing user profile attributes.
@@ -170,32 +261,14 @@ def predict_from_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
     Raises:
         ModelNotTrainedError: If model hasn't been trained yet.
     """
-    model = load_model()
-    if model is None:
+    try:
+        mtime_ns = MODEL_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
         raise ModelNotTrainedError()
 
-    # Ensure profile contains all expected candidate columns (fill missing keys with None)
-    candidates = [
-        "Age",
-        "Gender",
-        "Weight_kg",
-        "Height_cm",
-        "Physical_Activity_Level",
-        "Daily_Caloric_Intake",
-        "Dietary_Restrictions",
-        "Allergies",
-        "Preferred_Cuisine",
-        "Weekly_Exercise_Hours",
-    ]
-    full_profile = {c: profile.get(c) if isinstance(profile, dict) else None for c in candidates}
-    df = pd.DataFrame([full_profile])
-    X = _preprocess_frame(df)
-
-    probs = model.predict_proba(X)[0]
-    classes = model.named_steps["clf"].classes_
-    idx = int(np.argmax(probs))
+    diet, confidence, probabilities = _predict_row(mtime_ns, _profile_row(profile))
     return {
-        "diet_recommendation": str(classes[idx]),
-        "confidence": float(probs[idx]),
-        "probabilities": {str(c): float(p) for c, p in zip(classes, probs)}
-    }
\ No newline at end of file
+        "diet_recommendation": diet,
+        "confidence": confidence,
+        "probabilities": dict(probabilities),
+    }
@@ -0,0 +1,93 @@
+"""Struct-of-arrays view over a list of meals.
+
+Meals arrive as ORM rows or CSV-backed namespaces, and hot paths used to
+re-read `m.calories`, `m.protein`, ... and re-decode tags per object on
+every pass. `MealCatalog` walks the list once and keeps each numeric field
+in a contiguous NumPy array, with the decoded tags and ingredients in
+parallel lists, so scoring and filtering run as array operations.
+
+Dietary tags and ingredients are also one-hot encoded into boolean
+matrices (one column per distinct value), so preference and allergy
+filters reduce to column lookups and a boolean AND over all meals.
+"""
+
+from typing import Dict, Iterable, List, Sequence
+import numpy as np
+from core.serialization import parse_list
+
+
+class MealCatalog:
+    """Columnar snapshot of a meal list.
+
+    Index `i` of every array and list refers to `meals[i]`.
+
+    Attributes:
+        source: The sequence the catalog was built from.
+        meals: The original meal objects, in input order.
+        meal_types: Object array of each meal's `meal_type`.
+        calories, protein, carbs, fat: float64 arrays of the numeric fields.
+        tagsets: Stripped, lowercased dietary tags per meal as frozensets.
+        ingredients: Decoded ingredient lists per meal.
+        tag_index: Column of each tag in `tag_matrix`.
+        tag_matrix: bool[N, tags], True where meal `i` carries the tag.
+        ingredient_index: Column of each lowercased ingredient in
+            `ingredient_matrix`.
+        ingredient_matrix: bool[N, ingredients], True where meal `i` lists
+            the ingredient.
+    """
+
+    def __init__(self, meals: Sequence):
+        """Build the columns from `meals` in a single pass."""
+        self.source = meals
+        self.meals: List = list(meals)
+        n = len(self.meals)
+        self.meal_types = np.empty(n, dtype=object)
+        self.calories = np.empty(n)
+        self.protein = np.empty(n)
+        self.carbs = np.empty(n)
+        self.fat = np.empty(n)
+        self.tagsets: List[frozenset] = []
+        self.ingredients: List[list] = []
+        self.tag_index: Dict[str, int] = {}
+        self.ingredient_index: Dict[str, int] = {}
+        tag_cells = ([], [])
+        ing_cells = ([], [])
+        for i, m in enumerate(self.meals):
+            self.meal_types[i] = getattr(m, 'meal_type', None)
+            self.calories[i] = m.calories
+            self.protein[i] = m.protein
+            self.carbs[i] = m.carbs
+            self.fat[i] = m.fat
+            tags = parse_list(getattr(m, 'dietary_tags', None))
+            tagset = frozenset(str(t).strip().lower() for t in tags)
+            self.tagsets.append(tagset)
+            ingredients = parse_list(getattr(m, 'ingredients', None))
+            self.ingredients.append(ingredients)
+            for t in tagset:
+                tag_cells[0].append(i)
+                tag_cells[1].append(self.tag_index.setdefault(t, len(self.tag_index)))
+            for ing in ingredients:
+                ing_cells[0].append(i)
+                ing_cells[1].append(self.ingredient_index.setdefault(str(ing).lower(), len(self.ingredient_index)))
+
+        self.tag_matrix = np.zeros((n, len(self.tag_index)), dtype=bool)
+        self.tag_matrix[tag_cells] = True
+        self.ingredient_matrix = np.zeros((n, len(self.ingredient_index)), dtype=bool)
+        self.ingredient_matrix[ing_cells] = True
+
+    def __len__(self) -> int:
+        return len(self.meals)
+
+    def has_tag(self, tag: str) -> np.ndarray:
+        """Return a bool[N] mask of meals tagged with `tag`."""
+        col = self.tag_index.get(tag)
+        if col is None:
+            return np.zeros(len(self.meals), dtype=bool)
+        return self.tag_matrix[:, col]
+
+    def contains_any_ingredient(self, names: Iterable[str]) -> np.ndarray:
+        """Return a bool[N] mask of meals listing any of `names` (lowercased)."""
+        cols = [self.ingredient_index[n] for n in names if n in self.ingredient_index]
+        if not cols:
+            return np.zeros(len(self.meals), dtype=bool)
+        return self.ingredient_matrix[:, cols].any(axis=1)
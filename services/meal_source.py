@@ -0,0 +1,165 @@
+"""Meal sources shared by the API endpoints.
+
+Endpoints can rank meals from the database or from the bundled CSV
+fixtures. Both are read far more often than they change, so each is kept
+as an in-process snapshot: the CSV per file version, the meals table until
+a session commits a Meal write (or, for writes made by other processes,
+for at most a short TTL).
+"""
+
+import os
+import threading
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Optional, Tuple
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from data.ingest_meals import parse_meals_csv
+from database import models
+from services.meal_catalog import MealCatalog
+
+MEALS_CSV = "data/fixtures/healthy_meal_plans.csv"
+MEAL_CACHE_TTL = float(os.getenv("MEAL_CACHE_TTL", "60"))
+
+_MEAL_COLUMNS = (
+    models.Meal.id,
+    models.Meal.name,
+    models.Meal.meal_type,
+    models.Meal.calories,
+    models.Meal.protein,
+    models.Meal.carbs,
+    models.Meal.fat,
+    models.Meal.dietary_tags,
+    models.Meal.ingredients,
+)
+
+_meals_lock = threading.Lock()
+_meals_cache: Optional[Tuple[SimpleNamespace, ...]] = None
+_meals_cache_ts = 0.0
+_meals_catalog: Optional[MealCatalog] = None
+
+# session.info flag set by a Meal write and consumed at commit
+_MEALS_CHANGED = "meals_changed"
+
+
+@lru_cache(maxsize=4)
+def _load_csv(path: str, mtime: float) -> Tuple[SimpleNamespace, ...]:
+    """Parse a meals CSV into meal-like objects; `mtime` is only a cache key."""
+    return tuple(
+        SimpleNamespace(**{**r, "dietary_tags": r.get("dietary_tags", []), "ingredients": r.get("ingredients", [])})
+        for r in parse_meals_csv(path)
+    )
+
+
+@lru_cache(maxsize=4)
+def _load_csv_catalog(path: str, mtime: float) -> MealCatalog:
+    """Build the `MealCatalog` of a CSV file version; `mtime` is only a cache key."""
+    return MealCatalog(_load_csv(path, mtime))
+
+
+def load_csv_catalog(path: str = MEALS_CSV) -> MealCatalog:
+    """Return the cached `MealCatalog` of a CSV file's meals.
+
+    Args:
+        path: CSV file to load. Defaults to the bundled fixtures.
+
+    Returns:
+        Catalog shared between callers; treat as read-only.
+    """
+    return _load_csv_catalog(path, os.path.getmtime(path))
+
+
+def get_all_meals(db: Session, ttl: float = MEAL_CACHE_TTL) -> Tuple[SimpleNamespace, ...]:
+    """Return a snapshot of the meals table, reloading it at most every `ttl` seconds.
+
+    Rows are detached plain namespaces (not ORM objects) with tags and
+    ingredients already decoded to lists, so callers share one copy.
+
+    Args:
+        db: Session used to reload the snapshot on a miss.
+        ttl: Maximum snapshot age in seconds.
+
+    Returns:
+        Tuple of meal namespaces; treat as read-only.
+    """
+    global _meals_cache, _meals_cache_ts, _meals_catalog
+    with _meals_lock:
+        if _meals_cache is not None and time.monotonic() - _meals_cache_ts < ttl:
+            return _meals_cache
+        rows = db.execute(select(*_MEAL_COLUMNS)).all()
+        _meals_cache = tuple(
+            SimpleNamespace(
+                id=r.id,
+                name=r.name,
+                meal_type=r.meal_type,
+                calories=r.calories,
+                protein=r.protein,
+                carbs=r.carbs,
+                fat=r.fat,
+                dietary_tags=r.dietary_tags,
+                ingredients=r.ingredients,
+            )
+            for r in rows
+        )
+        _meals_cache_ts = time.monotonic()
+        _meals_catalog = None
+        return _meals_cache
+
+
+def get_meal_catalog(db: Session, ttl: float = MEAL_CACHE_TTL) -> MealCatalog:
+    """Return the `MealCatalog` of the current meals snapshot.
+
+    The catalog is built once per snapshot and shared until the snapshot is
+    reloaded or invalidated.
+
+    Args:
+        db: Session used to reload the snapshot on a miss.
+        ttl: Maximum snapshot age in seconds.
+
+    Returns:
+        Catalog whose `meals` are the snapshot rows; treat as read-only.
+    """
+    global _meals_catalog
+    meals = get_all_meals(db, ttl)
+    with _meals_lock:
+        # rebuild if the snapshot was reloaded since the catalog was built
+        if _meals_catalog is None or _meals_catalog.source is not meals:
+            _meals_catalog = MealCatalog(meals)
+        return _meals_catalog
+
+
+def invalidate_meal_cache() -> None:
+    """Drop the meals snapshot so the next `get_all_meals` call reloads it."""
+    global _meals_cache, _meals_catalog
+    with _meals_lock:
+        _meals_cache = None
+        _meals_catalog = None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_meal_statement(state) -> None:
+    """Flag sessions that run an INSERT/UPDATE/DELETE against `meals`."""
+    if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper is not None \
+            and state.bind_mapper.class_ is models.Meal:
+        state.session.info[_MEALS_CHANGED] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _note_meal_flush(session, flush_context) -> None:
+    """Flag sessions whose flush added, changed or deleted Meal objects."""
+    if any(isinstance(obj, models.Meal) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_MEALS_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_meal_commit(session) -> None:
+    """Drop the snapshot once a transaction that wrote meals commits."""
+    if session.info.pop(_MEALS_CHANGED, False):
+        invalidate_meal_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_meal_writes(session) -> None:
+    """Rolled-back meal writes never became visible; keep the snapshot."""
+    session.info.pop(_MEALS_CHANGED, None)
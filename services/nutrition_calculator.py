@@ -3,11 +3,41 @@
 Provides BMI/BMR/TDEE and macro allocation utilities used by the app.
 """
 
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Tuple
 from core.logger import get_logger
 
 logger = get_logger("services.nutrition_calculator")
 
+ACTIVITY_MULTIPLIERS = {
+    'sedentary': 1.2,
+    'lightly_active': 1.375,
+    'moderately_active': 1.55,
+    'very_active': 1.725,
+    'extremely_active': 1.9
+}
+
+# (protein, carbs, fat) share of calories per dietary preference
+MACRO_RATIOS = {
+    'keto': (0.3, 0.1, 0.6),
+    'high-protein': (0.4, 0.3, 0.3),
+    'balanced': (0.3, 0.4, 0.3),
+}
+
+
+@lru_cache(maxsize=256)
+def macro_grams(target_calories: float, dietary_preference: str) -> Tuple[int, int, int]:
+    """Return rounded (protein, carbs, fat) grams for a calorie target.
+
+    Shared by both calculators' `calculate_macros`; memoized because calorie
+    targets and preferences repeat across requests.
+    """
+    protein, carbs, fat = MACRO_RATIOS.get(dietary_preference, MACRO_RATIOS['balanced'])
+    return (round((target_calories * protein) / 4),
+            round((target_calories * carbs) / 4),
+            round((target_calories * fat) / 9))
+
+
 class NutritionCalculator:
     """Class-based nutrition calculator used across the app."""
 
@@ -27,14 +57,7 @@ class NutritionCalculator:
 
     def calculate_tdee(self, bmr: float, activity_level: str) -> float:
         """Estimate TDEE from BMR and activity multiplier."""
-        mapping = {
-            'sedentary': 1.2,
-            'lightly_active': 1.375,
-            'moderately_active': 1.55,
-            'very_active': 1.725,
-            'extremely_active': 1.9
-        }
-        val = bmr * mapping.get(activity_level, 1.2)
+        val = bmr * ACTIVITY_MULTIPLIERS.get(activity_level, 1.2)
         logger.debug("TDEE calculated: %s", val)
         return val
 
@@ -54,20 +77,52 @@ class NutritionCalculator:
 
         Supports simple presets for 'keto' and 'high-protein' preferences.
         """
-        if dietary_preference == 'keto':
-            ratios = {'protein': 0.3, 'carbs': 0.1, 'fat': 0.6}
-        elif dietary_preference == 'high-protein':
-            ratios = {'protein': 0.4, 'carbs': 0.3, 'fat': 0.3}
-        else:
-            ratios = {'protein': 0.3, 'carbs': 0.4, 'fat': 0.3}
-        protein_g = (target_calories * ratios['protein']) / 4
-        carbs_g = (target_calories * ratios['carbs']) / 4
-        fat_g = (target_calories * ratios['fat']) / 9
-        macros = {'protein': round(protein_g), 'carbs': round(carbs_g), 'fat': round(fat_g)}
+        protein, carbs, fat = macro_grams(target_calories, dietary_preference)
+        macros = {'protein': protein, 'carbs': carbs, 'fat': fat}
         logger.debug("Macros calculated: %s", macros)
         return macros
 
+    def compute_targets(self, age: int, height_cm: float, weight_kg: float, gender: str,
+                        activity_level: str, health_goal: str, dietary_preference: str) -> Dict[str, object]:
+        """Compute BMI, BMR, TDEE, calorie target and macros for a profile in one call.
+
+        Equivalent to chaining the individual `calculate_*` methods, so
+        callers that need the full set of targets don't repeat the sequence.
+        Profiles repeat heavily across users, so results are memoized per
+        distinct input; each call still returns fresh dicts.
+
+        Returns:
+            Dict with `bmi`, `bmr`, `tdee`, `target_calories` and `macros`.
+        """
+        bmi, bmr, tdee, target_calories, macros = profile_targets(
+            age, height_cm, weight_kg, gender, activity_level, health_goal, dietary_preference)
+        return {
+            'bmi': bmi,
+            'bmr': bmr,
+            'tdee': tdee,
+            'target_calories': target_calories,
+            'macros': dict(macros),
+        }
 
 # export singleton
 nutrition_calculator = NutritionCalculator()
+
+
+@lru_cache(maxsize=4096)
+def profile_targets(age, height_cm, weight_kg, gender, activity_level, health_goal,
+                    dietary_preference) -> Tuple[float, float, float, float, Tuple]:
+    """Memoized core of `compute_targets`, returning an immutable tuple.
+
+    Kept at module level, like `macro_grams`, so the cache does not hold a
+    reference to a calculator instance.
+    """
+    calc = nutrition_calculator
+    bmr = calc.calculate_bmr(age, height_cm, weight_kg, gender)
+    tdee = calc.calculate_tdee(bmr, activity_level)
+    target_calories = calc.calculate_target_calories(tdee, health_goal)
+    macros = calc.calculate_macros(target_calories, dietary_preference)
+    return (calc.calculate_bmi(height_cm, weight_kg), bmr, tdee, target_calories,
+            tuple(macros.items()))
+
+
 __all__ = ["NutritionCalculator", "nutrition_calculator"]
@@ -5,125 +5,115 @@ match a user's dietary preferences and goals.
 """
 
 from typing import List, Dict, Optional
+import logging
+import os
 import random
-import json
+from datetime import date, timedelta
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import weakref
+import numpy as np
 from core.logger import get_logger
+from services.meal_catalog import MealCatalog
+from services.nutrition_calculator import NutritionCalculator, nutrition_calculator
+from core.serialization import loads, parse_list
 
 logger = get_logger("services.recommendation_engine")
 
+# catalogs at least this large are scored in chunks across threads; NumPy
+# releases the GIL inside its array kernels, so chunks run on separate cores
+PARALLEL_SCORE_MIN_MEALS = 100_000
+SCORE_WORKERS = min(os.cpu_count() or 1, 8)
+# shared by every large score_meals call; threads start on first use
+_score_executor = ThreadPoolExecutor(max_workers=SCORE_WORKERS, thread_name_prefix="score-meals")
+POOL_CACHE_SIZE = 512
+
+# Candidate pools per catalog, keyed by (dietary_preference, allergens).
+# Catalogs are rebuilt whenever the meal data changes, so keying the outer
+# map weakly on the catalog object drops stale pools along with it.
+_pool_cache: "weakref.WeakKeyDictionary[MealCatalog, OrderedDict]" = weakref.WeakKeyDictionary()
+_pool_cache_lock = threading.Lock()
+
+
+def _ingredients_of(meal) -> list:
+    """Return a meal's ingredients as a list, decoding stored text only when needed."""
+    ingredients = getattr(meal, 'ingredients', None)
+    return ingredients if isinstance(ingredients, list) else parse_list(ingredients)
+
+
+def _plan_entry(meal) -> Dict:
+    """Build the plan dict for a selected meal, with nutrition rounded to 0.1.
+
+    CSV-backed meals have no `id`; every other field is present on both
+    ORM rows and the cached namespaces, so it is read directly.
+    """
+    return {
+        'id': getattr(meal, 'id', None),
+        'name': meal.name,
+        'meal_type': meal.meal_type,
+        'calories': round(meal.calories, 1),
+        'protein': round(meal.protein, 1),
+        'carbs': round(meal.carbs, 1),
+        'fat': round(meal.fat, 1),
+        'ingredients': _ingredients_of(meal),
+    }
+
+
+def _allergies_of(user_profile) -> list:
+    """Decode a profile's JSON `allergies` field, returning [] when unset or malformed."""
+    try:
+        return loads(user_profile.allergies) if user_profile.allergies else []
+    except Exception:
+        return []
+
+
 class RecommendationEngine:
     """Class-based recommendation engine for meal selection."""
 
-    def __init__(self, variety_weight: float = 0.3):
+    def __init__(self, variety_weight: float = 0.3, nutrition: Optional[NutritionCalculator] = None):
         """Initialize the recommendation engine.
 
         Parameters
         ----------
         variety_weight: float
             Weighting factor controlling how much variety is favored in selections.
+        nutrition: NutritionCalculator, optional
+            Calculator the BMI/BMR/TDEE/calorie/macro helpers below
+            delegate to. Defaults to the shared `nutrition_calculator`.
         """
         self.variety_weight = variety_weight
+        self.nutrition = nutrition or nutrition_calculator
 
-    # Nutrition calculations (optional helpers, keep lightweight)
+    # Nutrition helpers, delegated to `self.nutrition`
     def calculate_bmi(self, height_cm: float, weight_kg: float) -> float:
-        """Calculate Body Mass Index (BMI) from height and weight.
-        
-        Args:
-            height_cm: Height in centimeters.
-            weight_kg: Weight in kilograms.
-            
-        Returns:
-            BMI value as a float.
-        """
-        h_m = height_cm / 100.0
-        if h_m <= 0:
-            return 0.0
-        return weight_kg / (h_m * h_m)
+        """Calculate BMI from height in cm and weight in kg."""
+        return self.nutrition.calculate_bmi(height_cm, weight_kg)
 
     def calculate_bmr(self, age: int, height_cm: float, weight_kg: float, gender: str) -> float:
-        """Calculate Basal Metabolic Rate (BMR) using Mifflin-St Jeor equation.
-        
-        Args:
-            age: Age in years.
-            height_cm: Height in centimeters.
-            weight_kg: Weight in kilograms.
-            gender: Gender ('male' or 'female').
-            
-        Returns:
-            BMR value in calories per day.
-        """
-        if gender.lower() == 'male':
-            return 10 * weight_kg + 6.25 * height_cm - 5 * age + 5
-        else:
-            return 10 * weight_kg + 6.25 * height_cm - 5 * age - 161
+        """Calculate BMR using the Mifflin-St Jeor equation."""
+        return self.nutrition.calculate_bmr(age, height_cm, weight_kg, gender)
 
     def calculate_tdee(self, bmr: float, activity_level: str) -> float:
-        """Estimate Total Daily Energy Expenditure (TDEE) from BMR.
-        
-        Args:
-            bmr: Basal Metabolic Rate.
-            activity_level: Activity level string (e.g., 'sedentary', 'moderately_active').
-            
-        Returns:
-            TDEE value in calories per day.
-        """
-        mapping = {
-            'sedentary': 1.2,
-            'lightly_active': 1.375,
-            'moderately_active': 1.55,
-            'very_active': 1.725,
-            'extremely_active': 1.9
-        }
-        val = bmr * mapping.get(activity_level, 1.2)
-        logger.debug("TDEE calculated: %s", val)
-        return val
+        """Estimate TDEE from BMR and the activity multiplier."""
+        return self.nutrition.calculate_tdee(bmr, activity_level)
 
     def calculate_target_calories(self, tdee: float, health_goal: str) -> float:
-        """Apply goal-based adjustment to set daily target calories.
-        
-        Args:
-            tdee: Total Daily Energy Expenditure.
-            health_goal: Goal string ('weight_loss', 'muscle_gain', 'maintain').
-            
-        Returns:
-            Adjusted target calories per day.
-        """
-        if health_goal == 'weight_loss':
-            val = max(1200, tdee - 500)
-        elif health_goal == 'muscle_gain':
-            val = tdee + 300
-        else:
-            val = tdee
-        logger.debug("Target calories for goal %s: %s", health_goal, val)
-        return val
+        """Derive a daily calorie target from TDEE based on a health goal."""
+        return self.nutrition.calculate_target_calories(tdee, health_goal)
 
     def calculate_macros(self, target_calories: float, dietary_preference: str) -> Dict[str, float]:
-        """Convert target calories into gram-based macronutrient targets.
-        
-        Args:
-            target_calories: Daily calorie target.
-            dietary_preference: Preference string ('keto', 'high-protein', etc.).
-
-        Returns:
-            Dictionary with rounded gram targets for 'protein', 'carbs', 'fat'.
-        """
-        if dietary_preference == 'keto':
-            ratios = {'protein': 0.3, 'carbs': 0.1, 'fat': 0.6}
-        elif dietary_preference == 'high-protein':
-            ratios = {'protein': 0.4, 'carbs': 0.3, 'fat': 0.3}
-        else:
-            ratios = {'protein': 0.3, 'carbs': 0.4, 'fat': 0.3}
-        protein_g = (target_calories * ratios['protein']) / 4
-        carbs_g = (target_calories * ratios['carbs']) / 4
-        fat_g = (target_calories * ratios['fat']) / 9
-        macros = {'protein': round(protein_g), 'carbs': round(carbs_g), 'fat': round(fat_g)}
-        logger.debug("Macros calculated: %s", macros)
-        return macros
+        """Allocate macronutrient targets (grams) from a calorie target."""
+        return self.nutrition.calculate_macros(target_calories, dietary_preference)
 
     # Meal selection utilities
     def filter_meals_by_preference(self, all_meals: List, dietary_preference: str, allergies: Optional[List[str]] = None) -> List:
         """Filter a list of Meal objects by dietary preference and allergies.
 
+        Builds a `MealCatalog` over `all_meals` and applies
+        `filter_catalog_by_preference`, so both paths share the catalog's
+        decoded tag and ingredient sets.
+
         Args:
             all_meals: Iterable of meal ORM objects.
             dietary_preference: A string tag (e.g., 'vegetarian', 'keto').
@@ -133,43 +123,32 @@ class RecommendationEngine:
             List of Meal objects that match the given preference and do not
             contain listed allergy ingredients.
         """
-        out = []
-        for m in all_meals:
-            # robustly parse tags/ingredients whether stored as JSON strings or Python lists
-            tags = []
-            if hasattr(m, 'dietary_tags'):
-                if isinstance(m.dietary_tags, (list, tuple)):
-                    tags = [str(t).lower() for t in m.dietary_tags]
-                else:
-                    try:
-                        tags = [str(t).lower() for t in json.loads(m.dietary_tags)]
-                    except Exception:
-                        try:
-                            tags = [str(t).lower() for t in eval(m.dietary_tags)]
-                        except Exception:
-                            tags = []
-            ingredients = []
-            if hasattr(m, 'ingredients'):
-                if isinstance(m.ingredients, (list, tuple)):
-                    ingredients = [str(i).lower() for i in m.ingredients]
-                else:
-                    try:
-                        ingredients = [str(i).lower() for i in json.loads(m.ingredients)]
-                    except Exception:
-                        try:
-                            ingredients = [str(i).lower() for i in eval(m.ingredients)]
-                        except Exception:
-                            ingredients = []
-
-            if dietary_preference and dietary_preference != 'none':
-                if dietary_preference not in tags and dietary_preference != 'high-protein':
-                    continue
-            if allergies:
-                if any(a.lower() in (ing for ing in ingredients) for a in allergies):
-                    continue
-            out.append(m)
-        logger.debug("Filtered meals: %s -> %s", len(all_meals), len(out))
-        return out
+        catalog = MealCatalog(all_meals)
+        return [catalog.meals[i] for i in self.filter_catalog_by_preference(catalog, dietary_preference, allergies)]
+
+    def filter_catalog_by_preference(self, catalog: MealCatalog, dietary_preference: str, allergies: Optional[List[str]] = None) -> np.ndarray:
+        """Index-based `filter_meals_by_preference` over a `MealCatalog`.
+
+        Evaluates the preference and allergy checks as boolean masks over the
+        catalog's tag and ingredient matrices instead of parsing and looping
+        over every meal again.
+
+        Args:
+            catalog: `MealCatalog` of candidate meals.
+            dietary_preference: A string tag (e.g., 'vegetarian', 'keto').
+            allergies: Optional list of ingredients to exclude.
+
+        Returns:
+            Integer array of catalog indices that pass the filter.
+        """
+        mask = np.ones(len(catalog), dtype=bool)
+        if dietary_preference and dietary_preference != 'none' and dietary_preference != 'high-protein':
+            mask &= catalog.has_tag(dietary_preference)
+        if allergies:
+            mask &= ~catalog.contains_any_ingredient(a.lower() for a in allergies)
+        keep = np.flatnonzero(mask)
+        logger.debug("Filtered meals: %s -> %s", len(catalog), len(keep))
+        return keep
 
     def score_meal(self, meal, target_calories_per_meal: float, target_macros_per_meal: Dict[str, float], dietary_preference: str = 'balanced') -> float:
         """Compute a heuristic score for how well a meal matches targets.
@@ -210,13 +189,136 @@ class RecommendationEngine:
         macro_penalty = (p_diff + c_diff + f_diff) / denom
         macro_score = max(0, 50 - macro_penalty * 50) + protein_bonus
         
-        score = cal_score + macro_score + random.random()
-        logger.debug("Score meal %s: %.1f (cal=%.1f, macro=%.1f, bonus=%.1f)", 
-                    getattr(meal, 'name', None), score, cal_score, macro_score, protein_bonus)
+        score = cal_score + macro_score
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Score meal %s: %.1f (cal=%.1f, macro=%.1f, bonus=%.1f)",
+                         getattr(meal, 'name', None), score, cal_score, macro_score, protein_bonus)
         return score
 
+    def score_meals(self, catalog: MealCatalog, target_calories_per_meal: float, target_macros_per_meal: Dict[str, float], dietary_preference: str = 'balanced', idx: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized `score_meal` over every meal in a catalog.
+
+        Evaluates the same formula on the catalog's calorie and macro arrays
+        in a handful of NumPy operations, which is much cheaper than calling
+        `score_meal` per meal on large catalogs.
+
+        Args:
+            catalog: `MealCatalog` of the meals to score.
+            target_calories_per_meal: Target calories for this meal slot.
+            target_macros_per_meal: Target macros dict (protein, carbs, fat).
+            dietary_preference: User's dietary preference for weighted scoring.
+            idx: Optional catalog indices to score instead of every meal.
+
+        Returns:
+            Float array of scores aligned with `catalog.meals`, or with `idx`
+            when given.
+        """
+        if idx is None and SCORE_WORKERS > 1 and len(catalog) >= PARALLEL_SCORE_MIN_MEALS:
+            chunks = np.array_split(np.arange(len(catalog)), SCORE_WORKERS)
+            parts = _score_executor.map(lambda chunk: self.score_meals(catalog, target_calories_per_meal, target_macros_per_meal, dietary_preference, idx=chunk), chunks)
+            return np.concatenate(list(parts))
+
+        cals, prot, carbs, fat = catalog.calories, catalog.protein, catalog.carbs, catalog.fat
+        if idx is not None:
+            cals, prot, carbs, fat = cals[idx], prot[idx], carbs[idx], fat[idx]
+        return self._score_arrays(cals, prot, carbs, fat, target_calories_per_meal, target_macros_per_meal, dietary_preference)
+
+    def score_meal_list(self, meals: List, target_calories_per_meal: float, target_macros_per_meal: Dict[str, float], dietary_preference: str = 'balanced') -> np.ndarray:
+        """Vectorized `score_meal` over a plain list of meal objects.
+
+        Reads each meal's calories and macros once into arrays and scores
+        them with the same formula as `score_meals`.
+
+        Args:
+            meals: Meal objects to score.
+            target_calories_per_meal: Target calories for this meal slot.
+            target_macros_per_meal: Target macros dict (protein, carbs, fat).
+            dietary_preference: User's dietary preference for weighted scoring.
+
+        Returns:
+            Float array of scores aligned with `meals`.
+        """
+        cals, prot, carbs, fat = self._nutrition_arrays(meals)
+        return self._score_arrays(cals, prot, carbs, fat, target_calories_per_meal, target_macros_per_meal, dietary_preference)
+
+    @staticmethod
+    def _nutrition_arrays(meals: List):
+        """Return float64 calories, protein, carbs and fat arrays aligned with `meals`."""
+        n = len(meals)
+        return tuple(np.fromiter((getattr(m, f) for m in meals), dtype=np.float64, count=n)
+                     for f in ('calories', 'protein', 'carbs', 'fat'))
+
+    @staticmethod
+    def _score_arrays(cals: np.ndarray, prot: np.ndarray, carbs: np.ndarray, fat: np.ndarray, target_calories_per_meal: float, target_macros_per_meal: Dict[str, float], dietary_preference: str) -> np.ndarray:
+        """`score_meal` formula over aligned nutrition arrays.
+
+        Targets may be scalars or arrays aligned with the meals, so meals
+        bound for different slots can be scored in one pass.
+        """
+        cal_score = np.maximum(0, 30 - (np.abs(cals - target_calories_per_meal) / np.maximum(1, target_calories_per_meal)) * 30)
+
+        if dietary_preference == 'high-protein':
+            protein_weight = 3.0
+            carb_weight = 0.5
+            protein_pct = (prot * 4) / np.maximum(1, cals)
+            protein_bonus = np.where(protein_pct >= 0.35, 20, np.where(protein_pct >= 0.30, 10, 0))
+        else:
+            protein_weight = 1.0
+            carb_weight = 1.0
+            protein_bonus = 0
+
+        p_diff = np.abs(prot - target_macros_per_meal['protein']) * protein_weight
+        c_diff = np.abs(carbs - target_macros_per_meal['carbs']) * carb_weight
+        f_diff = np.abs(fat - target_macros_per_meal['fat'])
+
+        denom = (target_macros_per_meal['protein'] * protein_weight + target_macros_per_meal['carbs'] * carb_weight + np.maximum(1, target_macros_per_meal['fat']))
+        macro_penalty = (p_diff + c_diff + f_diff) / denom
+        macro_score = np.maximum(0, 50 - macro_penalty * 50) + protein_bonus
+
+        return cal_score + macro_score
+
+    def _best_per_slot(self, cals: np.ndarray, prot: np.ndarray, carbs: np.ndarray, fat: np.ndarray, slots: np.ndarray, slot_targets: List, dietary_preference: str) -> List[Optional[int]]:
+        """Pick the best meal for every slot of a plan in one scoring pass.
+
+        Each meal is scored against the targets of its own slot, with all
+        slots' arithmetic fused into a single `_score_arrays` call.
+
+        Args:
+            cals, prot, carbs, fat: Nutrition arrays of the candidate meals.
+            slots: Slot number of each meal (an index into `slot_targets`),
+                or -1 for meals that fit no slot.
+            slot_targets: `(target_calories, target_macros)` per slot.
+            dietary_preference: User's dietary preference for weighted scoring.
+
+        Returns:
+            Position of the best meal per slot (earliest on ties), or None
+            for slots without candidates.
+        """
+        fits = slots >= 0
+        slot_of = slots[fits]
+        target_c = np.array([t[0] for t in slot_targets], dtype=np.float64)[slot_of]
+        target_mac = {k: np.array([t[1][k] for t in slot_targets], dtype=np.float64)[slot_of] for k in ('protein', 'carbs', 'fat')}
+        scores = self._score_arrays(cals[fits], prot[fits], carbs[fits], fat[fits], target_c, target_mac, dietary_preference)
+        positions = np.flatnonzero(fits)
+        best = []
+        for k in range(len(slot_targets)):
+            in_slot = np.flatnonzero(slot_of == k)
+            best.append(int(positions[in_slot[np.argmax(scores[in_slot])]]) if len(in_slot) else None)
+        return best
+
+    @staticmethod
+    def _group_by_type(meals) -> Dict[str, List]:
+        """Group meals into lists by `meal_type` in a single scan."""
+        by_type = defaultdict(list)
+        for m in meals:
+            by_type[getattr(m, 'meal_type', None)].append(m)
+        return by_type
+
     def select_best_meal(self, meals_pool: List, meal_type: str, target_calories: float, target_macros: Dict[str, float], dietary_preference: str = 'balanced'):
         """Select the highest-scoring meal matching a given meal_type.
+
+        Scoring is deterministic; ties go to the earliest candidate in
+        `meals_pool`, so the same inputs always produce the same plan.
         
         Args:
             meals_pool: Pool of candidate meal objects.
@@ -232,11 +334,47 @@ class RecommendationEngine:
         if not candidates:
             logger.warning("No candidates for meal_type %s", meal_type)
             return None
-        best = max(candidates, key=lambda m: self.score_meal(m, target_calories, target_macros, dietary_preference))
+        scores = self.score_meal_list(candidates, target_calories, target_macros, dietary_preference)
+        best = candidates[int(np.argmax(scores))]
         logger.debug("Selected best meal for %s: %s", meal_type, best.name)
         return best
 
-    def generate_daily_meal_plan(self, user_profile, all_meals) -> Dict:
+    def build_candidate_pools(self, user_profile, catalog: MealCatalog) -> Dict[str, np.ndarray]:
+        """Compute the eligible catalog indices per meal type for a user.
+
+        Runs the preference/allergy filter once so that daily and weekly plan
+        generation for the same user can share the result. Pools are cached
+        per catalog and (preference, allergens), so users with the same
+        restrictions reuse them; the returned arrays are read-only.
+
+        Args:
+            user_profile: Object with `dietary_preference` and JSON `allergies`.
+            catalog: `MealCatalog` of the available meals.
+
+        Returns:
+            Mapping of meal type to an integer array of catalog indices.
+        """
+        allergies = _allergies_of(user_profile)
+        key = (user_profile.dietary_preference, frozenset(str(a).lower() for a in allergies))
+        with _pool_cache_lock:
+            cached = _pool_cache.setdefault(catalog, OrderedDict())
+            pools = cached.get(key)
+            if pools is not None:
+                cached.move_to_end(key)
+                return pools
+
+        pool_idx = self.filter_catalog_by_preference(catalog, user_profile.dietary_preference, allergies)
+        pool_types = catalog.meal_types[pool_idx]
+        pools = {mtype: pool_idx[pool_types == mtype] for mtype in ['breakfast', 'lunch', 'dinner', 'snack']}
+        for idx in pools.values():
+            idx.flags.writeable = False
+        with _pool_cache_lock:
+            cached[key] = pools
+            if len(cached) > POOL_CACHE_SIZE:
+                cached.popitem(last=False)
+        return pools
+
+    def generate_daily_meal_plan(self, user_profile, all_meals, catalog: Optional[MealCatalog] = None, pools: Optional[Dict[str, np.ndarray]] = None) -> Dict:
         """Generate a daily meal plan tailored to the given user profile.
 
         The plan divides target calories and macros across meal types and picks
@@ -245,6 +383,11 @@ class RecommendationEngine:
         Args:
             user_profile: ORM User object containing target calories/macros.
             all_meals: Iterable of Meal objects available for selection.
+            catalog: Optional `MealCatalog` already built over `all_meals`;
+                when given, filtering and scoring reuse its decoded tags and
+                numeric arrays.
+            pools: Optional result of `build_candidate_pools` for this user
+                and `catalog`, to skip filtering again.
 
         Returns:
             A dictionary with meal entries and daily totals.
@@ -253,53 +396,59 @@ class RecommendationEngine:
         per = {'breakfast': 0.25, 'lunch': 0.35, 'dinner': 0.35, 'snack': 0.05}
         total_macros = {'protein': user_profile.target_protein, 'carbs': user_profile.target_carbs, 'fat': user_profile.target_fat}
 
-        allergies = []
-        try:
-            allergies = json.loads(user_profile.allergies) if user_profile.allergies else []
-        except Exception:
-            allergies = []
-        pool = self.filter_meals_by_preference(all_meals, user_profile.dietary_preference, allergies)
+        if catalog is not None:
+            if pools is None:
+                pools = self.build_candidate_pools(user_profile, catalog)
+        else:
+            allergies = _allergies_of(user_profile)
+            pool = self.filter_meals_by_preference(all_meals, user_profile.dietary_preference, allergies)
+
+        mtypes = ['breakfast', 'lunch', 'dinner', 'snack']
+        slot_targets = [(target_calories * per[mtype], {k: total_macros[k] * per[mtype] for k in total_macros}) for mtype in mtypes]
+        # score every slot's candidates in one pass
+        if catalog is not None:
+            cand = np.concatenate([pools[mtype] for mtype in mtypes])
+            slots = np.repeat(np.arange(len(mtypes)), [len(pools[mtype]) for mtype in mtypes])
+            best = self._best_per_slot(catalog.calories[cand], catalog.protein[cand], catalog.carbs[cand], catalog.fat[cand],
+                                       slots, slot_targets, user_profile.dietary_preference)
+            selected = [catalog.meals[cand[b]] if b is not None else None for b in best]
+        else:
+            slot_index = {mtype: k for k, mtype in enumerate(mtypes)}
+            slots = np.fromiter((slot_index.get(m.meal_type, -1) for m in pool), dtype=np.intp, count=len(pool))
+            best = self._best_per_slot(*self._nutrition_arrays(pool), slots, slot_targets, user_profile.dietary_preference)
+            selected = [pool[b] if b is not None else None for b in best]
 
+        # any meal of the type backs up a slot without candidates; grouped once
+        by_type = self._group_by_type(all_meals) if None in selected else {}
         plan = {}
-        daily_totals = {'calories': 0, 'protein': 0, 'carbs': 0, 'fat': 0}
-        for mtype in ['breakfast', 'lunch', 'dinner', 'snack']:
-            target_c = target_calories * per[mtype]
-            target_mac = {k: total_macros[k] * per[mtype] for k in total_macros}
-            sel = self.select_best_meal(pool, mtype, target_c, target_mac, user_profile.dietary_preference)
+        # summed unrounded, in slot order
+        cal_total = pro_total = carb_total = fat_total = 0
+        for mtype, sel in zip(mtypes, selected):
             if sel is None:
-                candidates = [m for m in all_meals if getattr(m, 'meal_type', None) == mtype]
+                candidates = by_type.get(mtype)
                 if not candidates:
                     continue
                 sel = random.choice(candidates)
-            plan[mtype] = {
-                'id': getattr(sel, 'id', None),
-                'name': getattr(sel, 'name', None),
-                'meal_type': getattr(sel, 'meal_type', None),
-                'calories': round(getattr(sel, 'calories', 0), 1),
-                'protein': round(getattr(sel, 'protein', 0), 1),
-                'carbs': round(getattr(sel, 'carbs', 0), 1),
-                'fat': round(getattr(sel, 'fat', 0), 1),
-                'ingredients': sel.ingredients if isinstance(getattr(sel, 'ingredients', []), list) else (json.loads(sel.ingredients) if hasattr(sel, 'ingredients') and sel.ingredients else [])
-            }
-            daily_totals['calories'] += getattr(sel, 'calories', 0)
-            daily_totals['protein'] += getattr(sel, 'protein', 0)
-            daily_totals['carbs'] += getattr(sel, 'carbs', 0)
-            daily_totals['fat'] += getattr(sel, 'fat', 0)
+            plan[mtype] = _plan_entry(sel)
+            cal_total += sel.calories
+            pro_total += sel.protein
+            carb_total += sel.carbs
+            fat_total += sel.fat
 
         # Round totals to eliminate floating point noise
         plan['daily_totals'] = {
-            'calories': round(daily_totals['calories'], 1),
-            'protein': round(daily_totals['protein'], 1),
-            'carbs': round(daily_totals['carbs'], 1),
-            'fat': round(daily_totals['fat'], 1)
+            'calories': round(cal_total, 1),
+            'protein': round(pro_total, 1),
+            'carbs': round(carb_total, 1),
+            'fat': round(fat_total, 1)
         }
-        plan['date'] = __import__('datetime').date.today().isoformat()
+        plan['date'] = date.today().isoformat()
         logger.info("Generated plan for user %s: calories=%.1f, protein=%.1fg (target=%.1fg)", 
-                   getattr(user_profile, 'id', None), daily_totals['calories'], 
-                   daily_totals['protein'], user_profile.target_protein)
+                   getattr(user_profile, 'id', None), cal_total,
+                   pro_total, user_profile.target_protein)
         return plan
 
-    def generate_weekly_meal_plan(self, user_profile, all_meals) -> List[Dict]:
+    def generate_weekly_meal_plan(self, user_profile, all_meals, catalog: Optional[MealCatalog] = None, pools: Optional[Dict[str, np.ndarray]] = None) -> List[Dict]:
         """Generate a 7-day weekly meal plan with variety.
 
         Ensures meal variety by tracking used meals and avoiding repetition
@@ -312,22 +461,46 @@ class RecommendationEngine:
         Args:
             user_profile: ORM User object containing target calories/macros.
             all_meals: Iterable of Meal objects available for selection.
+            catalog: Optional `MealCatalog` already built over `all_meals`;
+                when given, the preference/allergy filter runs on it.
+            pools: Optional result of `build_candidate_pools` for this user
+                and `catalog`, to skip filtering again.
 
         Returns:
             List of 7 daily meal plan dictionaries.
         """
-        from datetime import date, timedelta
-        
         target_calories = user_profile.target_calories
         per = {'breakfast': 0.25, 'lunch': 0.35, 'dinner': 0.35, 'snack': 0.05}
         total_macros = {'protein': user_profile.target_protein, 'carbs': user_profile.target_carbs, 'fat': user_profile.target_fat}
 
-        allergies = []
-        try:
-            allergies = json.loads(user_profile.allergies) if user_profile.allergies else []
-        except Exception:
-            allergies = []
-        pool = self.filter_meals_by_preference(all_meals, user_profile.dietary_preference, allergies)
+        if catalog is not None:
+            if pools is None:
+                pools = self.build_candidate_pools(user_profile, catalog)
+            type_pools = {mtype: [catalog.meals[i] for i in idx] for mtype, idx in pools.items()}
+        else:
+            allergies = _allergies_of(user_profile)
+            pool = self.filter_meals_by_preference(all_meals, user_profile.dietary_preference, allergies)
+            type_pools = {mtype: [m for m in pool if m.meal_type == mtype] for mtype in ['breakfast', 'lunch', 'dinner', 'snack']}
+
+        # Fall back to any meal of the type when the filters leave none; the
+        # used-name rotation below then still varies the picks across days
+        if not all(type_pools.values()):
+            by_type = self._group_by_type(all_meals)
+            for mtype, type_pool in type_pools.items():
+                if not type_pool:
+                    type_pools[mtype] = by_type.get(mtype, [])
+
+        # Per-slot targets are the same every day, so each type pool is
+        # scored once up front; days only mask out meals already used.
+        # Named meals that are still available get a small variety bonus.
+        pool_names = {}
+        pool_scores = {}
+        for mtype, type_pool in type_pools.items():
+            target_mac = {k: total_macros[k] * per[mtype] for k in total_macros}
+            pool_names[mtype] = [getattr(m, 'name', None) for m in type_pool]
+            scores = self.score_meal_list(type_pool, target_calories * per[mtype], target_mac, user_profile.dietary_preference)
+            scores += np.fromiter((0.5 if name else 0.0 for name in pool_names[mtype]), dtype=np.float64, count=len(type_pool))
+            pool_scores[mtype] = scores
 
         weekly_plan = []
         # Track by meal name to support CSV sources (which don't have IDs)
@@ -338,67 +511,42 @@ class RecommendationEngine:
         for day_offset in range(7):
             plan_date = start_date + timedelta(days=day_offset)
             day_plan = {}
-            daily_totals = {'calories': 0, 'protein': 0, 'carbs': 0, 'fat': 0}
+            # summed unrounded, in slot order
+            cal_total = pro_total = carb_total = fat_total = 0
             
             for mtype in ['breakfast', 'lunch', 'dinner', 'snack']:
-                target_c = target_calories * per[mtype]
-                target_mac = {k: total_macros[k] * per[mtype] for k in total_macros}
-                
+                type_pool = type_pools[mtype]
+                if not type_pool:
+                    continue
+
                 # Filter out already used meals for variety (track by name)
-                available = [m for m in pool if m.meal_type == mtype and getattr(m, 'name', None) not in used_meals[mtype]]
-                
-                if not available:
+                used = used_meals[mtype]
+                available = np.fromiter((name not in used for name in pool_names[mtype]), dtype=bool, count=len(type_pool))
+                if not available.any():
                     # If all meals used, reset for this meal type
-                    logger.debug(f"Resetting used meals for {mtype} on day {day_offset + 1}")
-                    used_meals[mtype].clear()
-                    available = [m for m in pool if m.meal_type == mtype]
-                
-                if not available:
-                    # Fallback to any meal of this type
-                    available = [m for m in all_meals if getattr(m, 'meal_type', None) == mtype]
-                
-                if not available:
-                    continue
-                
-                # Score and select best meal with variety penalty
-                scored = []
-                for m in available:
-                    score = self.score_meal(m, target_c, target_mac, user_profile.dietary_preference)
-                    # Apply small variety bonus to encourage different meals
-                    meal_name = getattr(m, 'name', None)
-                    if meal_name and meal_name not in used_meals[mtype]:
-                        score += 0.5  # Small bonus for new meals
-                    scored.append((score, m))
-                
-                scored.sort(key=lambda x: x[0], reverse=True)
-                sel = scored[0][1]
+                    logger.debug("Resetting used meals for %s on day %s", mtype, day_offset + 1)
+                    used.clear()
+                    available[:] = True
+
+                sel = type_pool[int(np.argmax(np.where(available, pool_scores[mtype], -np.inf)))]
                 
                 # Mark as used by name
                 meal_name = getattr(sel, 'name', None)
                 if meal_name:
                     used_meals[mtype].add(meal_name)
                 
-                day_plan[mtype] = {
-                    'id': getattr(sel, 'id', None),
-                    'name': meal_name,
-                    'meal_type': getattr(sel, 'meal_type', None),
-                    'calories': round(getattr(sel, 'calories', 0), 1),
-                    'protein': round(getattr(sel, 'protein', 0), 1),
-                    'carbs': round(getattr(sel, 'carbs', 0), 1),
-                    'fat': round(getattr(sel, 'fat', 0), 1),
-                    'ingredients': sel.ingredients if isinstance(getattr(sel, 'ingredients', []), list) else (json.loads(sel.ingredients) if hasattr(sel, 'ingredients') and sel.ingredients else [])
-                }
-                daily_totals['calories'] += getattr(sel, 'calories', 0)
-                daily_totals['protein'] += getattr(sel, 'protein', 0)
-                daily_totals['carbs'] += getattr(sel, 'carbs', 0)
-                daily_totals['fat'] += getattr(sel, 'fat', 0)
+                day_plan[mtype] = _plan_entry(sel)
+                cal_total += sel.calories
+                pro_total += sel.protein
+                carb_total += sel.carbs
+                fat_total += sel.fat
             
             # Round totals to eliminate floating point noise
             day_plan['daily_totals'] = {
-                'calories': round(daily_totals['calories'], 1),
-                'protein': round(daily_totals['protein'], 1),
-                'carbs': round(daily_totals['carbs'], 1),
-                'fat': round(daily_totals['fat'], 1)
+                'calories': round(cal_total, 1),
+                'protein': round(pro_total, 1),
+                'carbs': round(carb_total, 1),
+                'fat': round(fat_total, 1)
             }
             day_plan['date'] = plan_date.isoformat()
             day_plan['day_of_week'] = plan_date.strftime('%A')
@@ -0,0 +1,39 @@
+"""Shared pytest fixtures."""
+import atexit
+import os
+import shutil
+import tempfile
+import pytest
+
+# Run against a throwaway copy of diet.db so the suite never rewrites the
+# tracked file. Set before `database` is imported, which reads the URL.
+if "WRITE_DATABASE_URL" not in os.environ:
+    _db_dir = tempfile.mkdtemp(prefix="diet-tests-")
+    atexit.register(shutil.rmtree, _db_dir, ignore_errors=True)
+    _db_path = os.path.join(_db_dir, "diet.db")
+    _src_db = os.path.join(os.path.dirname(__file__), os.pardir, "diet.db")
+    if os.path.exists(_src_db):
+        shutil.copyfile(_src_db, _db_path)
+    os.environ["WRITE_DATABASE_URL"] = f"sqlite:///{_db_path}"
+    os.environ.setdefault("READ_DATABASE_URL", os.environ["WRITE_DATABASE_URL"])
+
+# Tests must not read or write the shared on-disk caches.
+os.environ["CONTENT_FEATURES_CACHE_DIR"] = ""
+os.environ["MEAL_PARSE_CACHE_DIR"] = ""
+
+from database import init_db  # noqa: E402
+
+
+def pytest_configure(config):
+    # pytest-xdist registers this itself; keep plain runs free of unknown-mark warnings
+    config.addinivalue_line("markers", "xdist_group(name): run the marked tests on the same xdist worker")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _init_db():
+    """Create the schema and seed meals once before the first test runs.
+
+    `init_db` is idempotent (tables are created with checkfirst and meals
+    are seeded only into an empty table), so one call covers every module.
+    """
+    init_db()
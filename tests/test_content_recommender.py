@@ -22,7 +22,7 @@ class DummyDB:
     def __init__(self, meals):
         self._meals = meals
 
-    def query(self, model):
+    def query(self, *entities):
         class Q:
             def __init__(self, meals):
                 self._meals = meals
@@ -30,6 +30,10 @@ class DummyDB:
             def all(self):
                 return self._meals
 
+            def one(self):
+                # (count, max id) cache-token query
+                return (len(self._meals), max((m.id for m in self._meals), default=None))
+
         return Q(self._meals)
 
 
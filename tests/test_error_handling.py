@@ -4,7 +4,6 @@ Verifies that custom exceptions are properly raised and handled,
 returning appropriate error responses.
 """
 import pytest
-from database import init_db
 from database.database import ReadSessionLocal, WriteSessionLocal
 from core.exceptions import NotFoundError, ValidationError, ModelNotTrainedError
 from api.recommendations import submit_feedback, get_similar_meals
@@ -13,12 +12,6 @@ from schemas.feedback_schema import FeedbackCreateRequest
 from schemas.diet_schema import PredictRequest
 
 
-@pytest.fixture(scope="module", autouse=True)
-def setup_db():
-    """Initialize database before tests."""
-    init_db()
-
-
 def test_user_not_found_raises_404():
     """Test that requesting non-existent user raises NotFoundError."""
     db = WriteSessionLocal()
@@ -1,4 +1,7 @@
 """Tests for the CSV ingestion utilities in `data/ingest_meals.py`."""
+import os
+
+import data.ingest_meals
 from data.ingest_meals import parse_meals_csv, seed_meals_from_csv
 from database.database import ReadSessionLocal
 from database import models
@@ -11,6 +14,17 @@ def test_parse_meals_csv_has_expected_keys():
     assert "name" in first and "calories" in first and "dietary_tags" in first
 
 
+def test_parse_cache_is_written_to_the_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(data.ingest_meals, "PARSE_CACHE_DIR", str(tmp_path))
+    rows = parse_meals_csv("data/fixtures/healthy_meal_plans.csv")
+    cached = os.listdir(tmp_path)
+    assert len(cached) == 1 and cached[0].endswith(".parsed.json")
+    assert not os.path.exists("data/fixtures/healthy_meal_plans.csv.parsed.json")
+    # second load is served from the cache and matches the parsed rows
+    monkeypatch.setattr(data.ingest_meals, "iter_parse_meals_csv", None)
+    assert parse_meals_csv("data/fixtures/healthy_meal_plans.csv") == rows
+
+
 def test_seed_meals_is_idempotent():
     session = ReadSessionLocal()
     try:
@@ -24,3 +38,20 @@ def test_seed_meals_is_idempotent():
         assert after2 == after
     finally:
         session.close()
+
+
+def test_dtype_fallback_resumes_by_record(tmp_path):
+    # quoted ingredient lists span two physical lines, and a malformed
+    # calories cell well past the first chunks forces the inferred-dtype
+    # re-read after some records were already yielded
+    lines = ["meal_name,calories,protein,carbs,fat,vegan,ingredients"]
+    for i in range(20_000):
+        calories = "abc" if i == 15_000 else "0.5"
+        lines.append(f'Meal {i},{calories},0.2,0.3,0.1,1,"[""a"",\n""b{i}""]"')
+    csv_path = tmp_path / "multiline.csv"
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    meals = [meal for batch in data.ingest_meals.iter_parse_meals_csv(str(csv_path), chunksize=1000)
+             for meal in batch]
+    assert [meal["name"] for meal in meals] == [f"Meal {i}" for i in range(20_000)]
+    assert meals[-1]["ingredients"] == ["a", "b19999"]
@@ -0,0 +1,66 @@
+"""Unit tests for the columnar `MealCatalog`."""
+from types import SimpleNamespace
+
+import pytest
+
+from core.serialization import parse_list
+from services.meal_catalog import MealCatalog
+from services.recommendation_engine import RecommendationEngine
+
+
+def _meal(name, tags, ingredients, calories=400.0):
+    return SimpleNamespace(name=name, meal_type="lunch", calories=calories, protein=20.0,
+                           carbs=40.0, fat=10.0, dietary_tags=tags, ingredients=ingredients)
+
+
+# tags and ingredients in every stored shape: lists, JSON text, Python
+# literals written by older seeding code, and unset values
+MEALS = [
+    _meal("Tofu Bowl", ["vegan", "Vegetarian"], ["tofu", "Rice"]),
+    _meal("Chicken Salad", '["keto", "is_healthy"]', '["chicken", "lettuce"]'),
+    _meal("Lentil Soup", "['vegetarian', 'is_healthy']", "['lentils', 'peanuts']"),
+    _meal("Steak", None, None),
+    _meal("Salmon Plate", ["keto"], ["salmon", "rice"]),
+    _meal("Peanut Noodles", ["vegan"], ["noodles", "PEANUTS"]),
+]
+
+
+def _reference_filter(meals, preference, allergies):
+    """The per-meal loop the catalog masks replaced."""
+    check_tags = bool(preference) and preference not in ("none", "high-protein")
+    allergens = {a.lower() for a in allergies} if allergies else set()
+    out = []
+    for i, m in enumerate(meals):
+        tags = {str(t).lower() for t in parse_list(m.dietary_tags)}
+        ingredients = {str(v).lower() for v in parse_list(m.ingredients)}
+        if check_tags and preference not in tags:
+            continue
+        if allergens & ingredients:
+            continue
+        out.append(i)
+    return out
+
+
+@pytest.mark.parametrize("preference", [None, "none", "vegan", "vegetarian", "keto", "is_healthy", "paleo", "high-protein"])
+@pytest.mark.parametrize("allergies", [None, [], ["peanuts"], ["Rice", "chicken"], ["shellfish"]])
+def test_catalog_filter_matches_per_meal_filter(preference, allergies):
+    engine = RecommendationEngine()
+    expected = _reference_filter(MEALS, preference, allergies)
+    assert engine.filter_catalog_by_preference(MealCatalog(MEALS), preference, allergies).tolist() == expected
+    assert engine.filter_meals_by_preference(MEALS, preference, allergies) == [MEALS[i] for i in expected]
+
+
+def test_has_tag_and_contains_any_ingredient_masks():
+    catalog = MealCatalog(MEALS)
+    assert catalog.has_tag("vegetarian").tolist() == [True, False, True, False, False, False]
+    assert catalog.has_tag("missing").tolist() == [False] * len(MEALS)
+    assert catalog.contains_any_ingredient(["rice"]).tolist() == [True, False, False, False, True, False]
+    assert catalog.contains_any_ingredient(["peanuts", "salmon"]).tolist() == [False, False, True, False, True, True]
+    assert catalog.contains_any_ingredient([]).tolist() == [False] * len(MEALS)
+
+
+def test_numeric_columns_follow_input_order():
+    catalog = MealCatalog([_meal("a", [], [], calories=100.0), _meal("b", [], [], calories=250.0)])
+    assert len(catalog) == 2
+    assert catalog.calories.tolist() == [100.0, 250.0]
+    assert catalog.meal_types.tolist() == ["lunch", "lunch"]
@@ -0,0 +1,73 @@
+"""Tests for the in-process meals snapshot in `services/meal_source.py`."""
+from sqlalchemy import delete, insert, update
+
+from database import models
+from database.database import ReadSessionLocal, WriteSessionLocal
+from services.meal_source import get_all_meals, get_meal_catalog
+
+NEW_MEAL = {
+    "name": "Snapshot Test Bowl",
+    "meal_type": "lunch",
+    "calories": 420.0,
+    "protein": 30.0,
+    "carbs": 45.0,
+    "fat": 12.0,
+    "dietary_tags": ["vegan"],
+    "ingredients": ["tofu"],
+}
+
+
+def _names(db):
+    return {m.name for m in get_all_meals(db)}
+
+
+def test_committed_meal_writes_refresh_the_snapshot():
+    db = ReadSessionLocal()
+    write = WriteSessionLocal()
+    try:
+        assert NEW_MEAL["name"] not in _names(db)
+
+        # ORM add
+        meal = models.Meal(**NEW_MEAL)
+        write.add(meal)
+        write.commit()
+        assert NEW_MEAL["name"] in _names(db)
+        assert any(m.name == NEW_MEAL["name"] for m in get_meal_catalog(db).meals)
+
+        # Core-style update through the session
+        write.execute(update(models.Meal).where(models.Meal.id == meal.id).values(calories=500.0))
+        write.commit()
+        assert {m.name: m.calories for m in get_all_meals(db)}[NEW_MEAL["name"]] == 500.0
+
+        # ORM delete
+        write.delete(meal)
+        write.commit()
+        assert NEW_MEAL["name"] not in _names(db)
+    finally:
+        write.close()
+        db.close()
+
+
+def test_rolled_back_meal_writes_keep_the_snapshot():
+    db = ReadSessionLocal()
+    write = WriteSessionLocal()
+    try:
+        before = get_all_meals(db)
+        write.execute(insert(models.Meal), [NEW_MEAL])
+        write.rollback()
+        assert get_all_meals(db) is before
+    finally:
+        write.execute(delete(models.Meal).where(models.Meal.name == NEW_MEAL["name"]))
+        write.commit()
+        write.close()
+        db.close()
+
+
+def test_snapshot_expires_after_ttl():
+    db = ReadSessionLocal()
+    try:
+        first = get_all_meals(db)
+        assert get_all_meals(db) is first
+        assert get_all_meals(db, ttl=0) is not first
+    finally:
+        db.close()
@@ -1,5 +1,5 @@
 """Tests for the predict endpoint returning recommended meals."""
-from services.diet_trainer import load_model, train_from_csv
+from services.diet_trainer import load_model, predict_from_profile, train_from_csv
 from database.database import ReadSessionLocal
 from schemas.diet_schema import PredictRequest
 from api.train import predict
@@ -57,8 +57,41 @@ def test_predict_respects_dietary_preference():
             assert m['verified'] is True, f"Meal {m['id']} is not verified as vegan"
             from database import models
             meal_obj = db.get(models.Meal, m['id'])
-            import json as _json
-            tags = _json.loads(meal_obj.dietary_tags) if meal_obj.dietary_tags else []
+            tags = meal_obj.dietary_tags or []
             assert any('vegan' in str(t).lower() for t in tags), f"Meal {m['id']} tags do not indicate vegan: {tags}"
     finally:
         db.close()
+
+
+def test_predict_for_stored_user_uses_training_categories(monkeypatch):
+    import api.train
+    from database import models
+    from database.database import WriteSessionLocal
+
+    seen = []
+
+    def record(profile):
+        seen.append(profile)
+        return predict_from_profile(profile)
+
+    monkeypatch.setattr(api.train, "predict_from_profile", record)
+
+    write = WriteSessionLocal()
+    user = models.User(
+        name="Stored", age=40, height=172, weight=78, gender="female",
+        activity_level="very_active", dietary_preference="balanced", health_goal="maintain",
+        target_calories=2100, target_protein=150, target_carbs=200, target_fat=70,
+    )
+    write.add(user)
+    write.commit()
+    db = ReadSessionLocal()
+    try:
+        res = predict(PredictRequest(user_id=user.id), db)
+        assert seen[0]["Gender"] == "Female"
+        assert seen[0]["Physical_Activity_Level"] == "Active"
+        assert res.diet_recommendation
+    finally:
+        db.close()
+        write.delete(user)
+        write.commit()
+        write.close()
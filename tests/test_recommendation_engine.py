@@ -0,0 +1,65 @@
+"""Unit tests for `services/recommendation_engine.py`."""
+from types import SimpleNamespace
+
+import numpy as np
+
+import services.recommendation_engine as engine_module
+from services.meal_catalog import MealCatalog
+from services.recommendation_engine import RecommendationEngine
+
+
+def _catalog(n=1000, seed=7):
+    rng = np.random.default_rng(seed)
+    meals = [
+        SimpleNamespace(name=f"meal {i}", meal_type="lunch", calories=c, protein=p, carbs=cb, fat=f,
+                        dietary_tags=[], ingredients=[])
+        for i, (c, p, cb, f) in enumerate(rng.uniform(50, 900, size=(n, 4)).tolist())
+    ]
+    return MealCatalog(meals)
+
+
+def test_parallel_scores_match_serial_scores(monkeypatch):
+    engine = RecommendationEngine()
+    catalog = _catalog()
+    macros = {"protein": 30.0, "carbs": 60.0, "fat": 20.0}
+    serial = engine.score_meals(catalog, 600.0, macros, "high-protein")
+
+    calls = []
+    real_map = engine_module._score_executor.map
+
+    def counting_map(fn, *iterables):
+        calls.append(fn)
+        return real_map(fn, *iterables)
+
+    monkeypatch.setattr(engine_module, "PARALLEL_SCORE_MIN_MEALS", 10)
+    monkeypatch.setattr(engine_module, "SCORE_WORKERS", 4)
+    monkeypatch.setattr(engine_module._score_executor, "map", counting_map)
+    parallel = engine.score_meals(catalog, 600.0, macros, "high-protein")
+
+    assert len(calls) == 1
+    np.testing.assert_array_equal(parallel, serial)
+
+
+def test_nutrition_helpers_delegate_to_the_calculator():
+    class FixedCalculator:
+        def calculate_bmi(self, height_cm, weight_kg):
+            return 1.0
+
+        def calculate_bmr(self, age, height_cm, weight_kg, gender):
+            return 2.0
+
+        def calculate_tdee(self, bmr, activity_level):
+            return 3.0
+
+        def calculate_target_calories(self, tdee, health_goal):
+            return 4.0
+
+        def calculate_macros(self, target_calories, dietary_preference):
+            return {"protein": 5, "carbs": 6, "fat": 7}
+
+    engine = RecommendationEngine(nutrition=FixedCalculator())
+    assert engine.calculate_bmi(170, 70) == 1.0
+    assert engine.calculate_bmr(30, 170, 70, "male") == 2.0
+    assert engine.calculate_tdee(1500, "sedentary") == 3.0
+    assert engine.calculate_target_calories(2000, "maintain") == 4.0
+    assert engine.calculate_macros(2000, "balanced") == {"protein": 5, "carbs": 6, "fat": 7}
@@ -0,0 +1,35 @@
+"""Unit tests for the JSON helpers in `core/serialization.py`."""
+import pytest
+
+from core.serialization import dumps, loads, parse_list
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, []),
+    ("", []),
+    ([], []),
+    (["vegan", "keto"], ["vegan", "keto"]),
+    (("vegan",), ["vegan"]),
+    ('["vegan", "keto"]', ["vegan", "keto"]),
+    (b'["vegan"]', ["vegan"]),
+    # Python list literals written by older seeding code
+    ("['vegan', 'keto']", ["vegan", "keto"]),
+    ("('vegan', 'keto')", ["vegan", "keto"]),
+    # valid JSON or literals that are not lists
+    ("{}", []),
+    ('"x"', []),
+    ("3", []),
+    ("{'a': 1}", []),
+    # malformed text
+    ("[vegan", []),
+    ("__import__('os')", []),
+])
+def test_parse_list(value, expected):
+    assert parse_list(value) == expected
+
+
+def test_dumps_round_trips_through_loads():
+    value = {"tags": ["vegan", "keto"], "calories": 420.5}
+    text = dumps(value)
+    assert isinstance(text, str)
+    assert loads(text) == value
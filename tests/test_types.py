@@ -0,0 +1,79 @@
+"""Round-trip tests for the custom column types in `database/types.py`."""
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert, select, text
+from sqlalchemy.exc import StatementError
+
+from database.models import DietaryPreference
+from database.types import EnumCode, JSONList
+
+metadata = MetaData()
+rows = Table(
+    "rows",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("tags", JSONList),
+    Column("preference", EnumCode(DietaryPreference, label_sep="-")),
+)
+
+
+@pytest.fixture
+def conn():
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        yield connection
+
+
+def _raw(conn, column, row_id):
+    return conn.execute(text(f"SELECT {column} FROM rows WHERE id = :id"), {"id": row_id}).scalar()
+
+
+def _read(conn, column, row_id):
+    return conn.execute(select(rows.c[column]).where(rows.c.id == row_id)).scalar()
+
+
+def test_json_list_round_trip(conn):
+    conn.execute(insert(rows), [
+        {"id": 1, "tags": ["vegan", "keto"]},
+        {"id": 2, "tags": None},
+        {"id": 3, "tags": '["already", "encoded"]'},
+        {"id": 4, "tags": ("from", "tuple")},
+    ])
+    assert _raw(conn, "tags", 1) == '["vegan","keto"]'
+    assert _read(conn, "tags", 1) == ["vegan", "keto"]
+    assert _raw(conn, "tags", 2) is None
+    assert _read(conn, "tags", 2) == []
+    assert _read(conn, "tags", 3) == ["already", "encoded"]
+    assert _read(conn, "tags", 4) == ["from", "tuple"]
+
+
+@pytest.mark.parametrize("stored, expected", [
+    ("['vegan', 'keto']", ["vegan", "keto"]),
+    ("", []),
+    ("{}", []),
+    ("not json", []),
+])
+def test_json_list_reads_legacy_values(conn, stored, expected):
+    conn.execute(text("INSERT INTO rows (id, tags) VALUES (1, :tags)"), {"tags": stored})
+    assert _read(conn, "tags", 1) == expected
+
+
+def test_enum_code_round_trip(conn):
+    conn.execute(insert(rows), [
+        {"id": 1, "preference": "high-protein"},
+        {"id": 2, "preference": None},
+    ])
+    assert _raw(conn, "preference", 1) == int(DietaryPreference.HIGH_PROTEIN)
+    assert _read(conn, "preference", 1) == "high-protein"
+    assert _raw(conn, "preference", 2) is None
+    assert _read(conn, "preference", 2) is None
+
+
+def test_enum_code_rejects_unknown_labels(conn):
+    with pytest.raises(StatementError, match="not a valid DietaryPreference label"):
+        conn.execute(insert(rows), [{"id": 1, "preference": "carnivore"}])
+
+
+def test_enum_code_reads_legacy_text_unchanged(conn):
+    conn.execute(text("INSERT INTO rows (id, preference) VALUES (1, 'string')"))
+    assert _read(conn, "preference", 1) == "string"
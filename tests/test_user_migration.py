@@ -0,0 +1,72 @@
+"""Tests for rebuilding a pre-EnumCode users table."""
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from database import models
+from database.database import migrate_user_enum_columns
+
+LEGACY_USERS = """
+CREATE TABLE users (
+    id INTEGER NOT NULL, name VARCHAR NOT NULL, age INTEGER NOT NULL,
+    height FLOAT NOT NULL, weight FLOAT NOT NULL, gender VARCHAR NOT NULL,
+    activity_level VARCHAR NOT NULL, dietary_preference VARCHAR NOT NULL,
+    health_goal VARCHAR NOT NULL, allergies TEXT, target_calories FLOAT,
+    target_protein FLOAT, target_carbs FLOAT, target_fat FLOAT,
+    created_at DATETIME, PRIMARY KEY (id)
+)
+"""
+
+
+def _legacy_engine(tmp_path, rows):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(LEGACY_USERS))
+        conn.execute(
+            text(
+                "INSERT INTO users (id, name, age, height, weight, gender, activity_level,"
+                " dietary_preference, health_goal, created_at) VALUES (:id, 'u', 30, 170, 70,"
+                " :gender, :activity, :pref, :goal, '2026-01-04 07:33:56.775850')"
+            ),
+            rows,
+        )
+    return engine
+
+
+def test_legacy_users_are_rebuilt_with_codes(tmp_path):
+    engine = _legacy_engine(tmp_path, [
+        {"id": 1, "gender": " Male ", "activity": "3", "pref": "high-protein", "goal": "weight loss"},
+        {"id": 2, "gender": "female", "activity": "very_active", "pref": "2", "goal": "maintain"},
+    ])
+    with Session(engine) as session:
+        assert migrate_user_enum_columns(session) is True
+        session.commit()
+        # already numeric: nothing left to do
+        assert migrate_user_enum_columns(session) is False
+
+    columns = {c["name"]: c for c in inspect(engine).get_columns("users")}
+    for name in ("gender", "activity_level", "dietary_preference", "health_goal"):
+        assert columns[name]["nullable"] is False
+        assert str(columns[name]["type"]) == "SMALLINT"
+
+    with Session(engine) as session:
+        first, second = session.query(models.User).order_by(models.User.id).all()
+    assert (first.gender, first.activity_level, first.dietary_preference, first.health_goal) == (
+        "male", "moderately_active", "high-protein", "weight_loss")
+    assert (second.gender, second.activity_level, second.dietary_preference, second.health_goal) == (
+        "female", "very_active", "keto", "maintain")
+    assert first.created_at.year == 2026
+
+
+def test_unmappable_values_abort_the_migration(tmp_path):
+    engine = _legacy_engine(tmp_path, [
+        {"id": 1, "gender": "male", "activity": "1", "pref": "string", "goal": "maintain"},
+    ])
+    with Session(engine) as session:
+        with pytest.raises(RuntimeError, match="dietary_preference='string'"):
+            migrate_user_enum_columns(session)
+        session.rollback()
+
+    columns = {c["name"]: c for c in inspect(engine).get_columns("users")}
+    assert str(columns["dietary_preference"]["type"]) == "VARCHAR"
+    assert inspect(engine).get_table_names() == ["users"]
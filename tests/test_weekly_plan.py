@@ -1,104 +1,110 @@
 """Test weekly meal plan generation."""
 from services.recommendation_engine import recommendation_service
+from services.meal_source import get_all_meals
 from database.database import ReadSessionLocal
-from database import init_db, models
+from database import models
 from schemas.diet_schema import PredictRequest
 from api.train import predict
+from sqlalchemy import select
 import pytest
 
+# read-only tests sharing the module-scoped fixtures; keep them on one
+# worker under `pytest -n auto --dist loadgroup`
+pytestmark = pytest.mark.xdist_group("weekly_plan_readonly")
 
-@pytest.fixture(scope="module", autouse=True)
-def setup_db():
-    """Initialize database before tests."""
-    init_db()
+# built once; SQLAlchemy 2.0 caches the compiled form, so this replaces
+# the legacy baked-query extension
+FIRST_USER = select(models.User).limit(1)
 
 
-def test_weekly_plan_generates_seven_days():
+@pytest.fixture(scope="module")
+def db():
+    """One read session shared by every test in the module."""
+    session = ReadSessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="module")
+def meals_and_user(db):
+    """Load the first user and all meals once."""
+    user = db.scalars(FIRST_USER).first()
+    if not user:
+        pytest.skip("No users in database")
+    
+    # column-only snapshot, the same rows the API plans from
+    all_meals = get_all_meals(db)
+    if not all_meals:
+        pytest.skip("No meals in database")
+    return user, all_meals
+
+
+@pytest.fixture(scope="module")
+def weekly_plan(meals_and_user):
+    """Generate the first user's weekly plan once for every test that reads it."""
+    user, all_meals = meals_and_user
+    weekly = recommendation_service.generate_weekly_meal_plan(user, all_meals)
+    return user, all_meals, weekly
+
+
+def test_weekly_plan_generates_seven_days(weekly_plan):
     """Test that weekly plan generation creates 7 days of meals."""
-    db = ReadSessionLocal()
-    try:
-        user = db.query(models.User).first()
-        if not user:
-            pytest.skip("No users in database")
-        
-        all_meals = db.query(models.Meal).all()
-        if not all_meals:
-            pytest.skip("No meals in database")
-        
-        weekly = recommendation_service.generate_weekly_meal_plan(user, all_meals)
-        
-        assert len(weekly) == 7, "Should generate 7 days"
+    _, _, weekly = weekly_plan
+    
+    assert len(weekly) == 7, "Should generate 7 days"
+    
+    # Check each day has required structure
+    for day in weekly:
+        assert 'date' in day
+        assert 'day_of_week' in day
+        assert 'breakfast' in day
+        assert 'lunch' in day
+        assert 'dinner' in day
+        assert 'daily_totals' in day
         
-        # Check each day has required structure
-        for day in weekly:
-            assert 'date' in day
-            assert 'day_of_week' in day
-            assert 'breakfast' in day
-            assert 'lunch' in day
-            assert 'dinner' in day
-            assert 'daily_totals' in day
-            
-            # Check daily totals
-            assert day['daily_totals']['calories'] > 0
-            assert day['daily_totals']['protein'] > 0
-    finally:
-        db.close()
-
-
-def test_weekly_plan_has_variety():
+        # Check daily totals
+        assert day['daily_totals']['calories'] > 0
+        assert day['daily_totals']['protein'] > 0
+
+
+def test_weekly_plan_has_variety(weekly_plan):
     """Test that weekly plan provides meal variety."""
-    db = ReadSessionLocal()
-    try:
-        user = db.query(models.User).first()
-        if not user:
-            pytest.skip("No users in database")
-        
-        all_meals = db.query(models.Meal).all()
-        if not all_meals:
-            pytest.skip("No meals in database")
-        
-        weekly = recommendation_service.generate_weekly_meal_plan(user, all_meals)
-        
-        # Collect snack IDs across the week
-        snack_ids = [day.get('snack', {}).get('id') for day in weekly if day.get('snack')]
-        
-        # Check for variety in snacks (should have at least 2 different snacks if enough available)
-        if len(snack_ids) >= 2:
-            unique_snacks = len(set(snack_ids))
-            assert unique_snacks > 1, "Weekly plan should have variety in snacks"
-    finally:
-        db.close()
+    _, _, weekly = weekly_plan
+    
+    # Collect snack IDs across the week
+    snack_ids = [day.get('snack', {}).get('id') for day in weekly if day.get('snack')]
+    
+    # Check for variety in snacks (should have at least 2 different snacks if enough available)
+    if len(snack_ids) >= 2:
+        unique_snacks = len(set(snack_ids))
+        assert unique_snacks > 1, "Weekly plan should have variety in snacks"
 
 
-def test_predict_with_weekly_flag():
+def test_predict_with_weekly_flag(db):
     """Test that predict endpoint with weekly=True returns weekly plan."""
-    db = ReadSessionLocal()
-    try:
-        profile = {
-            "Age": 30,
-            "Gender": "Male",
-            "Weight_kg": 75,
-            "Height_cm": 175,
-            "Physical_Activity_Level": "Moderate",
-        }
-        
-        req = PredictRequest(profile=profile, weekly=True)
-        res = predict(request=req, db=db)
-        
-        assert res.weekly_plan is not None, "Should return weekly_plan"
-        assert res.daily_plan is None, "Should not return daily_plan when weekly=True"
-        assert len(res.weekly_plan) == 7, "Weekly plan should have 7 days"
-        
-        # Check first day structure
-        day1 = res.weekly_plan[0]
-        assert 'breakfast' in day1
-        assert 'lunch' in day1
-        assert 'dinner' in day1
-        assert 'daily_totals' in day1
-        assert 'day_of_week' in day1
-    finally:
-        db.close()
+    profile = {
+        "Age": 30,
+        "Gender": "Male",
+        "Weight_kg": 75,
+        "Height_cm": 175,
+        "Physical_Activity_Level": "Moderate",
+    }
+    
+    req = PredictRequest(profile=profile, weekly=True)
+    res = predict(request=req, db=db)
+    
+    assert res.weekly_plan is not None, "Should return weekly_plan"
+    assert res.daily_plan is None, "Should not return daily_plan when weekly=True"
+    assert len(res.weekly_plan) == 7, "Weekly plan should have 7 days"
+    
+    # Check first day structure
+    day1 = res.weekly_plan[0]
+    assert 'breakfast' in day1
+    assert 'lunch' in day1
+    assert 'dinner' in day1
+    assert 'daily_totals' in day1
+    assert 'day_of_week' in day1
 
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
+    pytest.main([__file__, "-q", "--tb=line", "--no-header"])